@@ -1,9 +1,9 @@
-from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 import os
 import json
 import pandas as pd
 from typing import List, Dict, Any
+from utils.llm_gateway import create_llm
 
 class JDSummarizerAgent:
     """Agent for summarizing job descriptions and generating relevant questions"""
@@ -12,11 +12,7 @@ class JDSummarizerAgent:
         """Initialize the JD Summarizer Agent"""
         self.api_key = api_key or os.getenv("CHATGROQ_API_KEY")
         self.model_name = model_name
-        self.llm = ChatGroq(
-            groq_api_key=self.api_key,
-            model_name=self.model_name,
-            temperature=0.2
-        )
+        self.llm = create_llm("jd_summarizer", self.api_key, self.model_name, temperature=0.2)
         
     def summarize_jd(self, job_title: str, job_description: str) -> Dict[str, Any]:
         """Summarize a job description and generate relevant questions"""
@@ -1,8 +1,8 @@
-from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 import os
 import json
 from typing import Dict, Any, List
+from utils.llm_gateway import create_llm
 
 class RecruitingAgent:
     """Agent for evaluating candidates based on job requirements"""
@@ -11,11 +11,7 @@ class RecruitingAgent:
         """Initialize the Recruiting Agent"""
         self.api_key = api_key or os.getenv("CHATGROQ_API_KEY")
         self.model_name = model_name
-        self.llm = ChatGroq(
-            groq_api_key=self.api_key,
-            model_name=self.model_name,
-            temperature=0.2
-        )
+        self.llm = create_llm("recruiting", self.api_key, self.model_name, temperature=0.2)
     
     def evaluate_candidate(self, jd_data: Dict[str, Any], resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate a candidate based on job requirements and resume data"""
@@ -148,8 +144,10 @@ class RecruitingAgent:
             
         except Exception as e:
             print(f"Error in evaluating candidate: {e}")
+            # The error key tells callers the evaluation did not happen, so it can be retried
             return {
                 "question_scores": [],
                 "overall_score": 0.0,
-                "general_feedback": f"Error evaluating candidate: {str(e)}"
+                "general_feedback": f"Error evaluating candidate: {str(e)}",
+                "error": f"Error evaluating candidate: {str(e)}"
             }
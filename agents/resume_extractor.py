@@ -1,61 +1,220 @@
-from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 from langchain.document_loaders import PyPDFLoader
 import os
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Callable, Tuple
 import re
 import sys
+import time
+import multiprocessing
 sys.path.append('/Users/adityakapole/Downloads/Accenture')
-from utils.helpers import mask_pii
+from utils.llm_gateway import create_llm
+from utils.minhash import MinHashLSHIndex
+from utils.helpers import mask_pii, compute_file_hash
+from utils.rate_limit import estimate_tokens
+from utils.skills import SkillMatcher
+
+# Bump whenever the extraction prompt changes so cached results are not reused
+PROMPT_VERSION = "2"
+BATCH_PROMPT_VERSION = "batch-2"
+
+# Contact details are always extracted with these rules instead of the LLM
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}')
+NAME_PATTERN = re.compile(r'^\s*(?:Full\s+)?Name\s*[:\-]\s*(.+?)\s*$', re.IGNORECASE | re.MULTILINE)
+
+# Resume text sent to the LLM is truncated to this many characters
+MAX_RESUME_CHARS = 4000
+
+# Seconds between checks of PDF worker progress and per-file deadlines
+PDF_POLL_INTERVAL = 0.05
+
+def _load_pdf_text(pdf_path: str) -> str:
+    """Load and join the text of every page in a PDF (module-level so worker processes can run it)"""
+    loader = PyPDFLoader(pdf_path)
+    pages = loader.load()
+    return " ".join([page.page_content for page in pages])
+
+_pdf_started = None
+
+def _init_pdf_worker(started) -> None:
+    global _pdf_started
+    _pdf_started = started
+
+def _load_pdf_text_timed(i: int, pdf_path: str) -> str:
+    """Report when file i starts in a worker process, so its timeout covers only its own parsing time"""
+    _pdf_started.put((i, time.monotonic()))
+    return _load_pdf_text(pdf_path)
 
 class ResumeExtractorAgent:
     """Agent for extracting structured information from resumes"""
     
-    def __init__(self, api_key=None, model_name="llama3-8b-8192"):
-        """Initialize the Resume Extractor Agent"""
+    def __init__(self, api_key=None, model_name="llama3-8b-8192", cache=None, use_llm=True, skill_matcher=None,
+                 near_duplicate_index: Optional[MinHashLSHIndex] = None):
+        """Initialize the Resume Extractor Agent (use_llm=False keeps extraction to the rule-based fast path)"""
         self.api_key = api_key or os.getenv("CHATGROQ_API_KEY")
         self.model_name = model_name
-        self.llm = ChatGroq(
-            groq_api_key=self.api_key,
-            model_name=self.model_name,
-            temperature=0.1
-        )
+        self.cache = cache
+        self.use_llm = use_llm
+        self.skill_matcher = skill_matcher or SkillMatcher()
+        self.near_duplicate_index = near_duplicate_index
+        self.llm = create_llm("resume_extractor", self.api_key, self.model_name, temperature=0.1)
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text content from a PDF file"""
         try:
-            loader = PyPDFLoader(pdf_path)
-            pages = loader.load()
-            text = " ".join([page.page_content for page in pages])
-            return text
+            return _load_pdf_text(pdf_path)
         except Exception as e:
             print(f"Error extracting text from PDF {pdf_path}: {e}")
             return ""
     
-    def extract_resume_info(self, resume_text: str) -> Dict[str, Any]:
+    def extract_texts_from_pdfs(self, pdf_paths: List[str], max_workers: Optional[int] = None, timeout: float = 60.0,
+                                progress_callback: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Extract text from many PDFs in parallel worker processes, returning texts in input order"""
+        texts = [""] * len(pdf_paths)
+        file_hashes = [None] * len(pdf_paths)
+        pending = []
+        
+        # Serve already-parsed files from the cache
+        for i, pdf_path in enumerate(pdf_paths):
+            try:
+                file_hashes[i] = compute_file_hash(pdf_path) if self.cache else None
+            except OSError as e:
+                print(f"Error reading PDF {pdf_path}: {e}")
+                continue
+            
+            cached = self.cache.get_text(file_hashes[i]) if file_hashes[i] else None
+            if cached is not None:
+                texts[i] = cached
+            else:
+                pending.append(i)
+        
+        done = len(pdf_paths) - len(pending)
+        if progress_callback:
+            progress_callback(done, len(pdf_paths))
+        if not pending:
+            return texts
+        
+        # Spawned, not forked: callers run this from background worker threads
+        context = multiprocessing.get_context("spawn")
+        while pending:
+            started = context.SimpleQueue()
+            pool = context.Pool(
+                processes=min(max_workers or os.cpu_count() or 1, len(pending)),
+                initializer=_init_pdf_worker, initargs=(started,)
+            )
+            try:
+                results = {i: pool.apply_async(_load_pdf_text_timed, (i, pdf_paths[i])) for i in pending}
+                start_times = {}
+                remaining = list(pending)
+                timed_out = []
+                
+                # A failing or hanging PDF only costs its own slot; each file gets timeout seconds from when it starts
+                while remaining and not timed_out:
+                    while not started.empty():
+                        i, start_time = started.get()
+                        start_times[i] = start_time
+                    
+                    now = time.monotonic()
+                    for i in list(remaining):
+                        if results[i].ready():
+                            try:
+                                texts[i] = results[i].get()
+                            except Exception as e:
+                                print(f"Error extracting text from PDF {pdf_paths[i]}: {e}")
+                        elif i in start_times and now - start_times[i] > timeout:
+                            print(f"Timed out extracting text from PDF {pdf_paths[i]} after {timeout}s")
+                            timed_out.append(i)
+                        else:
+                            continue
+                        
+                        remaining.remove(i)
+                        if texts[i] and file_hashes[i]:
+                            self.cache.set_text(file_hashes[i], texts[i])
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, len(pdf_paths))
+                    
+                    if remaining and not timed_out:
+                        time.sleep(PDF_POLL_INTERVAL)
+            finally:
+                # Workers stuck on a PDF never return, so stop the pool instead of waiting
+                pool.terminate()
+                pool.join()
+            
+            # Files still queued or running beside a hung one start over in a fresh pool
+            pending = remaining
+        
+        return texts
+    
+    def pre_extract(self, resume_text: str) -> Dict[str, Any]:
+        """Extract contact details and skills with compiled regexes and the skills automaton"""
+        return {
+            "name": self._extract_name(resume_text),
+            "email": self._extract_email(resume_text),
+            "phone": self._extract_phone(resume_text),
+            "skills": self.skill_matcher.find_skills(resume_text)
+        }
+    
+    def _apply_fast_path(self, result: Dict[str, Any], fast_fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill contact details and skills from the rule-based fast path into an LLM extraction"""
+        result["email"] = fast_fields["email"]
+        result["phone"] = fast_fields["phone"]
+        result["skills"] = fast_fields["skills"]
+        if not result.get("name"):
+            result["name"] = fast_fields["name"]
+        return result
+    
+    def extract_resume_info(self, resume_text: str, file_hash: Optional[str] = None) -> Dict[str, Any]:
         """Extract structured information from resume text"""
         
+        # The rule-based fast path always runs first
+        fast_fields = self.pre_extract(resume_text)
+        if not self.use_llm:
+            return self._fallback_resume_info(resume_text, fast_fields)
+        
+        # Reuse a previous extraction of the same file, model and prompt
+        cached = self._get_cached_extraction(file_hash)
+        if cached is not None:
+            return self._apply_fast_path(cached, fast_fields)
+        
+        try:
+            result = self._extract_with_llm(resume_text)
+        except json.JSONDecodeError:
+            # Fallback to manual parsing if JSON extraction fails
+            return self._fallback_resume_info(resume_text, fast_fields)
+        except Exception as e:
+            print(f"Error in extracting resume information: {e}")
+            # A failed LLM call (e.g. quota exhausted) is an error, not a rule-based extraction, so it can be retried
+            return {"error": f"Error extracting resume information: {e}"}
+        
+        # Only successful LLM extractions are cached
+        if file_hash and self.cache:
+            self.cache.set_extraction(file_hash, self.model_name, PROMPT_VERSION, result)
+        
+        return self._apply_fast_path(result, fast_fields)
+    
+    def _extract_with_llm(self, resume_text: str) -> Dict[str, Any]:
+        """Ask the LLM for structured resume information, raising if the response cannot be parsed"""
+        
         # Mask PII in the resume text before sending to the LLM
         masked_text = mask_pii(resume_text)
         
         prompt = f"""You are an expert resume parser. Your task is to extract key information from resumes into a structured format.
         Extract only the information that is explicitly mentioned in the resume. Do not make assumptions or add information that is not present.
         If a field is not found in the resume, leave it empty or null.
+        Contact details and skills are extracted separately, so only extract the fields listed below.
 
         Please extract the following information from this resume:
 
-        {masked_text[:4000]}  # Limit text length to avoid token limits
+        {masked_text[:MAX_RESUME_CHARS]}  # Limit text length to avoid token limits
         
         Format your response as a JSON with the following structure:
         {{
             "name": "candidate name",
-            "email": "email address",
-            "phone": "phone number",
             "education": [
                 {{"degree": "degree name", "institution": "institution name", "year": "graduation year"}}
             ],
-            "skills": ["skill1", "skill2", ...],
             "experience": [
                 {{"title": "job title", "company": "company name", "duration": "duration", "description": "brief description"}}
             ],
@@ -66,56 +225,169 @@ class ResumeExtractorAgent:
         Ensure the output is valid JSON format.
         """
         
-        try:
-            response = self.llm.invoke(prompt)
-            
-            # Handle potential formatting issues in the response
+        response = self.llm.invoke(prompt)
+        
+        # Try to extract JSON from the response
+        json_match = re.search(r'({.*})', response.replace('\n', ''), re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group(1))
+        
+        # Try to parse the entire response as JSON
+        return json.loads(response)
+    
+    def _get_cached_extraction(self, file_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Look up a cached extraction from either the single or the batched prompt"""
+        if not file_hash or not self.cache:
+            return None
+        for prompt_version in (PROMPT_VERSION, BATCH_PROMPT_VERSION):
+            cached = self.cache.get_extraction(file_hash, self.model_name, prompt_version)
+            if cached is not None:
+                return cached
+        return None
+    
+    def plan_batches(self, resume_texts: List[str], max_batch_size: int = 4, token_budget: int = 4000) -> List[List[int]]:
+        """Group resume indices into batches whose masked text fits the prompt token budget"""
+        batches = []
+        current = []
+        current_tokens = 0
+        
+        for i, resume_text in enumerate(resume_texts):
+            tokens = estimate_tokens(resume_text[:MAX_RESUME_CHARS])
+            if current and (len(current) >= max_batch_size or current_tokens + tokens > token_budget):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(i)
+            current_tokens += tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def extract_resume_info_batch(self, resume_texts: List[str], file_hashes: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """Extract structured information for several resumes with one LLM call, falling back to single calls"""
+        if not self.use_llm:
+            return [self.extract_resume_info(resume_text) for resume_text in resume_texts]
+        
+        file_hashes = file_hashes or [None] * len(resume_texts)
+        results: List[Optional[Dict[str, Any]]] = [self._get_cached_extraction(file_hash) for file_hash in file_hashes]
+        pending = [i for i, result in enumerate(results) if result is None]
+        
+        if len(pending) > 1:
             try:
-                # Try to extract JSON from the response
-                import re
-                json_match = re.search(r'({.*})', response.replace('\n', ''), re.DOTALL)
-                if json_match:
-                    result = json.loads(json_match.group(1))
-                else:
-                    # Try to parse the entire response as JSON
-                    result = json.loads(response)
-            except json.JSONDecodeError:
-                # Fallback to manual parsing if JSON extraction fails
-                result = {
-                        "name": self._extract_name(resume_text),
-                        "email": self._extract_email(resume_text),
-                        "phone": self._extract_phone(resume_text),
-                        "education": [],
-                        "skills": [],
-                        "experience": [],
-                        "qualifications": [],
-                        "certifications": []
-                    }
-            
-            return result
+                batch_results = self._extract_batch_with_llm({f"R{i + 1}": resume_texts[i] for i in pending})
+            except Exception as e:
+                print(f"Error in batch extracting resume information: {e}")
+                batch_results = {}
             
-        except Exception as e:
-            print(f"Error in extracting resume information: {e}")
-            # Fallback to basic extraction
-            return {
-                "name": self._extract_name(resume_text),
-                "email": self._extract_email(resume_text),
-                "phone": self._extract_phone(resume_text),
-                "education": [],
-                "skills": [],
-                "experience": [],
-                "qualifications": [],
-                "certifications": []
-            }
-    
-    def process_resume_file(self, pdf_path: str) -> Dict[str, Any]:
-        """Process a PDF resume file and extract information"""
+            for i in pending:
+                result = batch_results.get(f"R{i + 1}")
+                if result is not None:
+                    results[i] = result
+                    if file_hashes[i] and self.cache:
+                        self.cache.set_extraction(file_hashes[i], self.model_name, BATCH_PROMPT_VERSION, result)
+        
+        # Anything missing from the batch response is retried on its own
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = self.extract_resume_info(resume_texts[i], file_hash=file_hashes[i])
+            else:
+                results[i] = self._apply_fast_path(result, self.pre_extract(resume_texts[i]))
+        
+        return results
+    
+    def _extract_batch_with_llm(self, resume_texts: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Ask the LLM to extract several resumes at once, returning the parsed results keyed by resume ID"""
+        
+        # Mask PII in every resume before sending to the LLM
+        sections = "\n\n".join(
+            f"=== RESUME ID: {resume_id} ===\n{mask_pii(resume_text)[:MAX_RESUME_CHARS]}"
+            for resume_id, resume_text in resume_texts.items()
+        )
+        
+        prompt = f"""You are an expert resume parser. Your task is to extract key information from several resumes into a structured format.
+        Extract only the information that is explicitly mentioned in each resume. Do not make assumptions or add information that is not present.
+        If a field is not found in a resume, leave it empty or null.
+        Contact details and skills are extracted separately, so only extract the fields listed below.
+        Each resume starts with a line of the form "=== RESUME ID: <id> ===".
+
+        Please extract the following information from these resumes:
+
+        {sections}
+        
+        Format your response as a JSON array with one object per resume, using the following structure:
+        [
+            {{
+                "resume_id": "resume ID",
+                "name": "candidate name",
+                "education": [
+                    {{"degree": "degree name", "institution": "institution name", "year": "graduation year"}}
+                ],
+                "experience": [
+                    {{"title": "job title", "company": "company name", "duration": "duration", "description": "brief description"}}
+                ],
+                "qualifications": ["qualification1", "qualification2", ...],
+                "certifications": ["certification1", "certification2", ...]
+            }}
+        ]
+        
+        Return exactly one object for every resume ID. Ensure the output is valid JSON format.
+        """
+        
+        response = self.llm.invoke(prompt)
+        
+        # Try to extract the JSON array from the response
+        json_match = re.search(r'(\[.*\])', response.replace('\n', ''), re.DOTALL)
+        items = json.loads(json_match.group(1) if json_match else response)
+        
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and str(item.get("resume_id")) in resume_texts:
+                results[str(item.pop("resume_id"))] = item
+        return results
+    
+    def _fallback_resume_info(self, resume_text: str, fast_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Build a resume record from the rule-based fast path alone"""
+        fast_fields = fast_fields or self.pre_extract(resume_text)
+        return {
+            "name": fast_fields["name"],
+            "email": fast_fields["email"],
+            "phone": fast_fields["phone"],
+            "education": [],
+            "skills": fast_fields["skills"],
+            "experience": [],
+            "qualifications": [],
+            "certifications": []
+        }
+    
+    def find_near_duplicate(self, resume_text: str, threshold: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """Find the most similar previously indexed resume, as (key, estimated Jaccard), before any extraction work"""
+        if self.near_duplicate_index is None or not resume_text:
+            return None
+        matches = self.near_duplicate_index.query_text(resume_text, threshold)
+        return matches[0] if matches else None
+    
+    def index_resume(self, key: Any, resume_text: str) -> None:
+        """Add a resume to the near-duplicate index under a key such as its candidate ID"""
+        if self.near_duplicate_index is not None and resume_text:
+            self.near_duplicate_index.insert(key, self.near_duplicate_index.signature(resume_text))
+    
+    def process_resume_file(self, pdf_path: str, resume_text: Optional[str] = None) -> Dict[str, Any]:
+        """Process a PDF resume file and extract information, optionally reusing already extracted text"""
         try:
-            resume_text = self.extract_text_from_pdf(pdf_path)
+            file_hash = compute_file_hash(pdf_path) if self.cache else None
+            
+            if resume_text is None and file_hash:
+                resume_text = self.cache.get_text(file_hash)
+            if resume_text is None:
+                resume_text = self.extract_text_from_pdf(pdf_path)
+                if resume_text and file_hash:
+                    self.cache.set_text(file_hash, resume_text)
+            
             if not resume_text:
                 return {"error": f"Failed to extract text from {pdf_path}"}
             
-            resume_info = self.extract_resume_info(resume_text)
+            resume_info = self.extract_resume_info(resume_text, file_hash=file_hash)
             resume_info["source_file"] = os.path.basename(pdf_path)
             
             return resume_info
@@ -124,9 +396,38 @@ class ResumeExtractorAgent:
             print(f"Error processing resume file {pdf_path}: {e}")
             return {"error": str(e), "source_file": os.path.basename(pdf_path)}
     
-    # Fallback extraction methods using regex
+    def process_resume_batch(self, pdf_paths: List[str], resume_texts: List[str]) -> List[Dict[str, Any]]:
+        """Process several already-parsed resumes with one batched extraction prompt"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(pdf_paths)
+        valid = []
+        
+        for i, (pdf_path, resume_text) in enumerate(zip(pdf_paths, resume_texts)):
+            if resume_text:
+                valid.append(i)
+            else:
+                results[i] = {"error": f"Failed to extract text from {pdf_path}", "source_file": os.path.basename(pdf_path)}
+        
+        try:
+            file_hashes = [compute_file_hash(pdf_paths[i]) if self.cache else None for i in valid]
+            infos = self.extract_resume_info_batch([resume_texts[i] for i in valid], file_hashes)
+        except Exception as e:
+            print(f"Error processing resume batch: {e}")
+            infos = [{"error": str(e)} for _ in valid]
+        
+        for i, info in zip(valid, infos):
+            info["source_file"] = os.path.basename(pdf_paths[i])
+            results[i] = info
+        
+        return results
+    
+    # Rule-based extraction methods used by the fast path
     def _extract_name(self, text: str) -> str:
-        """Extract name from resume text (fallback method)"""
+        """Extract name from resume text (rule-based fast path)"""
+        # Prefer an explicit "Name:" label when the resume has one
+        match = NAME_PATTERN.search(text)
+        if match:
+            return match.group(1)
+        
         # This is a simplified approach and may not work for all resumes
         lines = text.split('\n')
         # Assume name is in the first few lines
@@ -137,13 +438,11 @@ class ResumeExtractorAgent:
         return "Unknown"
     
     def _extract_email(self, text: str) -> str:
-        """Extract email from resume text (fallback method)"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        match = re.search(email_pattern, text)
+        """Extract email from resume text (rule-based fast path)"""
+        match = EMAIL_PATTERN.search(text)
         return match.group(0) if match else ""
     
     def _extract_phone(self, text: str) -> str:
-        """Extract phone number from resume text (fallback method)"""
-        phone_pattern = r'(\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}'
-        match = re.search(phone_pattern, text)
+        """Extract phone number from resume text (rule-based fast path)"""
+        match = PHONE_PATTERN.search(text)
         return match.group(0) if match else ""
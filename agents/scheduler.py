@@ -1,10 +1,10 @@
-from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 import os
 import json
 from typing import Dict, Any, List
 import sys
 sys.path.append('/Users/adityakapole/Downloads/Accenture')
+from utils.llm_gateway import create_llm
 from utils.helpers import generate_interview_dates, generate_interview_times, generate_interview_email, generate_rejection_email
 
 class InterviewSchedulerAgent:
@@ -14,11 +14,7 @@ class InterviewSchedulerAgent:
         """Initialize the Interview Scheduler Agent"""
         self.api_key = api_key or os.getenv("CHATGROQ_API_KEY")
         self.model_name = model_name
-        self.llm = ChatGroq(
-            groq_api_key=self.api_key,
-            model_name=self.model_name,
-            temperature=0.3
-        )
+        self.llm = create_llm("scheduler", self.api_key, self.model_name, temperature=0.3)
     
     def generate_interview_format(self, jd_data: Dict[str, Any], candidate_data: Dict[str, Any]) -> str:
         """Determine the appropriate interview format based on job and candidate data"""
@@ -49,7 +49,8 @@ class ShortlistingAgent:
         
         for candidate in candidates:
             similarity_score = candidate.get("similarity_score")
-            recruiting_score = candidate.get("recruiting_score", {}).get("overall_score") if "recruiting_score" in candidate else None
+            # Candidates below the similarity threshold have no recruiting evaluation (None)
+            recruiting_score = (candidate.get("recruiting_score") or {}).get("overall_score")
             
             should_shortlist, reason = self.should_shortlist(similarity_score, recruiting_score, job_title)
             
@@ -68,7 +69,7 @@ class ShortlistingAgent:
         # Calculate final score for each candidate
         for candidate in shortlisted_candidates:
             similarity_score = candidate.get("similarity_score", 0)
-            recruiting_score = candidate.get("recruiting_score", {}).get("overall_score", 0)
+            recruiting_score = (candidate.get("recruiting_score") or {}).get("overall_score", 0)
             candidate["final_score"] = self.calculate_final_score(similarity_score, recruiting_score)
         
         # Sort by final score (descending)
@@ -1,16 +1,20 @@
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, Any, List, Tuple
 import json
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.inverted_index import InvertedIndex
 
 class SimilarityScoreCalculator:
     """Calculate similarity between job descriptions and resumes using TF-IDF"""
     
-    def __init__(self, model_name=None):
-        """Initialize the Similarity Score Calculator with TF-IDF"""
+    def __init__(self, model_name=None, term_index: InvertedIndex = None):
+        """Initialize the Similarity Score Calculator with TF-IDF
+        
+        term_index is an optional persistent inverted index of processed resumes, used by retrieve_top_k.
+        """
         # Use TF-IDF vectorizer instead of sentence-transformers
         self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.term_index = term_index
     
     def _preprocess_jd(self, jd_data: Dict[str, Any]) -> str:
         """Preprocess job description data for embedding"""
@@ -90,49 +94,79 @@ class SimilarityScoreCalculator:
     
     def calculate_similarity(self, jd_data: Dict[str, Any], resume_data: Dict[str, Any]) -> float:
         """Calculate similarity score between job description and resume using TF-IDF"""
+        return float(self.score_batch(jd_data, [resume_data])[0])
+    
+    def score_batch(self, jd_data: Dict[str, Any], resumes: List[Dict[str, Any]]) -> np.ndarray:
+        """Score every resume against the job description with a single TF-IDF fit"""
+        if not resumes:
+            return np.zeros(0)
+        
         try:
             # Preprocess data
             jd_text = self._preprocess_jd(jd_data)
-            resume_text = self._preprocess_resume(resume_data)
+            resume_texts = [self._preprocess_resume(resume_data) for resume_data in resumes]
             
-            # Generate TF-IDF vectors
-            tfidf_matrix = self.vectorizer.fit_transform([jd_text, resume_text])
+            # Fit one vocabulary and IDF over the JD and the whole resume pool
+            tfidf_matrix = self.vectorizer.fit_transform([jd_text] + resume_texts)
             
-            # Calculate cosine similarity
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            # Rows are L2-normalised, so one sparse product gives every cosine similarity
+            similarities = tfidf_matrix[1:].dot(tfidf_matrix[0].T).toarray().ravel()
             
-            # Scale to 0-10 range
-            score = float(similarity * 10)
-            
-            # Ensure score is within bounds
-            return max(0, min(10, score))
+            # Scale to 0-10 range and ensure scores are within bounds
+            return np.clip(similarities * 10, 0, 10)
             
         except Exception as e:
             print(f"Error calculating similarity: {e}")
-            return 0.0
+            return np.zeros(len(resumes))
     
     def calculate_requirement_matches(self, jd_data: Dict[str, Any], resume_data: Dict[str, Any]) -> List[Tuple[str, float]]:
         """Calculate similarity for each key requirement using TF-IDF"""
-        requirement_scores = []
+        if "key_requirements" not in jd_data or not jd_data["key_requirements"]:
+            return []
+        
+        scores = self.requirement_match_matrix(jd_data, [resume_data])
+        return [(req, float(score)) for req, score in zip(jd_data["key_requirements"], scores[:, 0])]
+    
+    def requirement_match_matrix(self, jd_data: Dict[str, Any], resumes: List[Dict[str, Any]]) -> np.ndarray:
+        """Score every key requirement against every resume, returning a requirements x resumes matrix"""
+        requirements = jd_data.get("key_requirements") or []
+        if not requirements or not resumes:
+            return np.zeros((len(requirements), len(resumes)))
         
         try:
-            if "key_requirements" not in jd_data or not jd_data["key_requirements"]:
-                return []
+            resume_texts = [self._preprocess_resume(resume_data) for resume_data in resumes]
             
-            resume_text = self._preprocess_resume(resume_data)
+            # Embed all requirements and all resumes in one shared TF-IDF space
+            tfidf_matrix = self.vectorizer.fit_transform(list(requirements) + resume_texts)
+            requirement_vectors = tfidf_matrix[:len(requirements)]
+            resume_vectors = tfidf_matrix[len(requirements):]
             
-            for req in jd_data["key_requirements"]:
-                # Generate TF-IDF vectors for this requirement and the resume
-                tfidf_matrix = self.vectorizer.fit_transform([req, resume_text])
-                
-                # Calculate cosine similarity
-                similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-                
-                score = float(similarity * 10)
-                requirement_scores.append((req, max(0, min(10, score))))
+            # Rows are L2-normalised, so one sparse product gives the full cosine matrix
+            similarities = requirement_vectors.dot(resume_vectors.T).toarray()
             
-            return requirement_scores
+            return np.clip(similarities * 10, 0, 10)
             
         except Exception as e:
             print(f"Error calculating requirement matches: {e}")
-            return []
+            return np.zeros((len(requirements), len(resumes)))
+    
+    def index_resumes(self, resumes: Dict[int, Dict[str, Any]]) -> None:
+        """Add extracted resumes to the term index, keyed by candidate ID"""
+        if self.term_index is None or not resumes:
+            return
+        self.term_index.add_documents(
+            {candidate_id: self._preprocess_resume(resume_data) for candidate_id, resume_data in resumes.items()}
+        )
+    
+    def retrieve_top_k(self, jd_data: Dict[str, Any], k: int = 50) -> List[Tuple[int, float]]:
+        """Rank every indexed resume against the job description, returning the k best (candidate ID, score 0-10)
+        
+        Reads only the posting lists of the job description's terms, so no PDFs are parsed and no LLM is called.
+        """
+        if self.term_index is None:
+            raise ValueError("retrieve_top_k requires a term_index")
+        
+        return [
+            (candidate_id, min(score * 10, 10.0))
+            for candidate_id, score in self.term_index.retrieve_top_k(self._preprocess_jd(jd_data), k)
+        ]
@@ -1,23 +1,20 @@
 import streamlit as st
 import os
-import pandas as pd
-import json
-from pathlib import Path
 import tempfile
 import time
-from typing import Dict, Any, List
 
-# Import agents
-from agents.jd_summarizer import JDSummarizerAgent
-from agents.resume_extractor import ResumeExtractorAgent
-from agents.similarity import SimilarityScoreCalculator
-from agents.recruiting import RecruitingAgent
-from agents.shortlisting import ShortlistingAgent
-from agents.scheduler import InterviewSchedulerAgent
+# Agents (langchain, the PDF loader, scikit-learn), pandas and the worker pool are imported by the pages
+# that use them, so the first page renders without loading them; see benchmarks/bench_import_time.py
 
 # Import database
 from database.db import Database
-from database.models import JobDescription, Candidate, CandidateEvaluation
+from database.jobs import JobQueue
+
+# LLM usage stats
+from utils.llm_gateway import get_gateway
+
+# Groq model used by the interactive agents
+DEFAULT_MODEL = "llama3-8b-8192"
 
 # Set page configuration
 st.set_page_config(
@@ -37,14 +34,77 @@ if "processed_candidates" not in st.session_state:
     st.session_state.processed_candidates = {"shortlisted": [], "rejected": []}
 if "db" not in st.session_state:
     st.session_state.db = Database()
+if "max_in_flight" not in st.session_state:
+    st.session_state.max_in_flight = 4
+if "requests_per_minute" not in st.session_state:
+    st.session_state.requests_per_minute = 30
+if "tokens_per_minute" not in st.session_state:
+    st.session_state.tokens_per_minute = 30000
+if "extraction_batch_size" not in st.session_state:
+    st.session_state.extraction_batch_size = 1
+if "fast_triage" not in st.session_state:
+    st.session_state.fast_triage = False
+if "near_duplicate_threshold" not in st.session_state:
+    st.session_state.near_duplicate_threshold = 0.8
+if "near_duplicate_mode" not in st.session_state:
+    st.session_state.near_duplicate_mode = "Merge"
+if "term_index" not in st.session_state:
+    st.session_state.term_index = None
+if "processing_job_id" not in st.session_state:
+    st.session_state.processing_job_id = None
+if "loaded_processing_job_id" not in st.session_state:
+    st.session_state.loaded_processing_job_id = None
+
+@st.cache_resource
+def get_worker_pool():
+    """Start one pool of background resume workers per server process, shared by every session"""
+    from pipeline.worker import WorkerPool
+    return WorkerPool(Database(), num_workers=int(os.getenv("RESUME_WORKERS", "2"))).start()
+
+# Agents are shared across reruns and sessions per API key and model, so their LLM clients keep connections open
+@st.cache_resource(max_entries=16)
+def get_jd_summarizer(api_key, model_name=DEFAULT_MODEL):
+    """Get the JD Summarizer Agent for an API key and model"""
+    from agents.jd_summarizer import JDSummarizerAgent
+    return JDSummarizerAgent(api_key=api_key, model_name=model_name)
+
+@st.cache_resource(max_entries=16)
+def get_interview_scheduler(api_key, model_name=DEFAULT_MODEL):
+    """Get the Interview Scheduler Agent for an API key and model"""
+    from agents.scheduler import InterviewSchedulerAgent
+    return InterviewSchedulerAgent(api_key=api_key, model_name=model_name)
+
+@st.cache_resource
+def get_shortlisting_agent():
+    """Get the Shortlisting Agent"""
+    from agents.shortlisting import ShortlistingAgent
+    return ShortlistingAgent()
+
+# Dataset reads are cached until the file (or directory listing) changes; the mtime argument is the cache key
+@st.cache_data(max_entries=4)
+def _read_job_descriptions(jd_path, mtime):
+    import pandas as pd
+    return pd.read_csv(jd_path, encoding='latin1')  # Try latin1 encoding first
+
+@st.cache_data(max_entries=4)
+def _list_resumes(cv_path, mtime):
+    return [f for f in os.listdir(cv_path) if f.endswith(".pdf")]
+
+def get_term_index():
+    """Open the session's term index on first use"""
+    if st.session_state.term_index is None:
+        from utils.inverted_index import InvertedIndex
+        st.session_state.term_index = InvertedIndex()
+    return st.session_state.term_index
 
 # Helper functions
 def load_job_descriptions():
     """Load job descriptions from CSV file"""
     try:
         jd_path = os.path.join("Dataset", "job_description.csv")
-        return pd.read_csv(jd_path, encoding='latin1')  # Try latin1 encoding first
+        return _read_job_descriptions(jd_path, os.path.getmtime(jd_path))
     except Exception as e:
+        import pandas as pd
         st.error(f"Error loading job descriptions: {e}")
         return pd.DataFrame(columns=["Job Title", "Job Description"])
 
@@ -52,7 +112,7 @@ def load_resumes():
     """Get list of resume files"""
     try:
         cv_path = os.path.join("Dataset", "CVs1")
-        return [f for f in os.listdir(cv_path) if f.endswith(".pdf")]
+        return _list_resumes(cv_path, os.path.getmtime(cv_path))
     except Exception as e:
         st.error(f"Error loading resumes: {e}")
         return []
@@ -70,9 +130,48 @@ def main():
         if api_key != st.session_state.api_key:
             st.session_state.api_key = api_key
         
+        # LLM throughput settings
+        st.header("LLM Throughput")
+        st.session_state.max_in_flight = st.slider("Concurrent LLM requests", 1, 16, st.session_state.max_in_flight)
+        st.session_state.requests_per_minute = st.number_input(
+            "Requests per minute", min_value=1, max_value=100000, value=st.session_state.requests_per_minute
+        )
+        st.session_state.tokens_per_minute = st.number_input(
+            "Tokens per minute", min_value=100, max_value=10000000, value=st.session_state.tokens_per_minute
+        )
+        
+        st.session_state.extraction_batch_size = st.slider(
+            "Resumes per extraction prompt", 1, 8, st.session_state.extraction_batch_size
+        )
+        
+        st.session_state.fast_triage = st.checkbox(
+            "Fast triage (no LLM)", value=st.session_state.fast_triage,
+            help="Score resumes on regex contact details and taxonomy skills only, skipping LLM extraction and evaluation"
+        )
+        
+        # Edited resubmissions of stored resumes
+        st.header("Deduplication")
+        st.session_state.near_duplicate_threshold = st.slider(
+            "Near-duplicate threshold (Jaccard)", 0.5, 1.0, st.session_state.near_duplicate_threshold, 0.05
+        )
+        st.session_state.near_duplicate_mode = st.radio(
+            "Near-duplicate resumes", ["Merge", "Flag"], index=["Merge", "Flag"].index(st.session_state.near_duplicate_mode),
+            help="Merge reuses the matching stored candidate; Flag processes the resume anyway and shows a warning"
+        )
+        
+        # Per-agent LLM usage across this server process
+        llm_stats = get_gateway().stats()
+        if llm_stats:
+            import pandas as pd
+            with st.expander("LLM Usage"):
+                st.dataframe(pd.DataFrame(llm_stats).T[[
+                    "calls", "cache_hits", "coalesced", "upstream_calls", "errors",
+                    "avg_latency_seconds", "prompt_tokens", "completion_tokens"
+                ]])
+        
         # Navigation
         st.header("Navigation")
-        menu = ["Upload JD", "Process CVs", "View Results", "Shortlist Candidates", "Generate Emails"]
+        menu = ["Upload JD", "Process CVs", "View Results", "Search Candidates", "Shortlist Candidates", "Generate Emails"]
         choice = st.radio("Go to", menu)
     
     # Main content
@@ -82,6 +181,8 @@ def main():
         process_cvs_page()
     elif choice == "View Results":
         view_results_page()
+    elif choice == "Search Candidates":
+        search_candidates_page()
     elif choice == "Shortlist Candidates":
         shortlist_candidates_page()
     elif choice == "Generate Emails":
@@ -96,6 +197,7 @@ def upload_jd_page():
         jd_df = load_job_descriptions()
     except UnicodeDecodeError:
         # Try with different encoding if UTF-8 fails
+        import pandas as pd
         try:
             jd_path = os.path.join("Dataset", "job_description.csv")
             jd_df = pd.read_csv(jd_path, encoding='latin1')
@@ -114,8 +216,8 @@ def upload_jd_page():
             
             if st.button("Process Selected Job Description"):
                 with st.spinner("Processing job description..."):
-                    # Initialize JD Summarizer Agent
-                    jd_agent = JDSummarizerAgent(api_key=st.session_state.api_key)
+                    # Get the shared JD Summarizer Agent
+                    jd_agent = get_jd_summarizer(st.session_state.api_key)
                     
                     # Process job description
                     result = jd_agent.summarize_jd(selected_job, job_description)
@@ -134,6 +236,7 @@ def upload_jd_page():
                         questions=result.get("evaluation_questions")
                     )
                     
+                    result["job_id"] = job_id
                     st.success(f"Job description processed successfully! Job ID: {job_id}")
                     
                     # Display results
@@ -156,8 +259,8 @@ def upload_jd_page():
     
     if st.button("Process Custom Job Description") and job_title and job_description:
         with st.spinner("Processing job description..."):
-            # Initialize JD Summarizer Agent
-            jd_agent = JDSummarizerAgent(api_key=st.session_state.api_key)
+            # Get the shared JD Summarizer Agent
+            jd_agent = get_jd_summarizer(st.session_state.api_key)
             
             # Process job description
             result = jd_agent.summarize_jd(job_title, job_description)
@@ -176,6 +279,7 @@ def upload_jd_page():
                 questions=result.get("evaluation_questions")
             )
             
+            result["job_id"] = job_id
             st.success(f"Job description processed successfully! Job ID: {job_id}")
             
             # Display results
@@ -233,100 +337,90 @@ def process_cvs_page():
             temp_files.append(file_path)
         
         process_resumes(temp_files, is_temp=True)
+    
+    processing_jobs_section()
 
 def process_resumes(resume_files, is_temp=False):
-    """Process resumes and calculate similarity scores"""
+    """Queue resumes for background processing and return immediately"""
     if not resume_files:
         st.warning("No resumes selected!")
         return
     
-    job_data = st.session_state.job_data
-    
-    # Initialize agents
-    resume_agent = ResumeExtractorAgent(api_key=st.session_state.api_key)
-    similarity_calculator = SimilarityScoreCalculator()
-    recruiting_agent = RecruitingAgent(api_key=st.session_state.api_key)
-    
-    # Process each resume
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    candidates = []
-    
-    for i, resume_file in enumerate(resume_files):
-        status_text.text(f"Processing resume {i+1}/{len(resume_files)}: {resume_file}")
+    # Construct full paths if not using temp files
+    if not is_temp:
+        resume_paths = [os.path.join("Dataset", "CVs1", resume_file) for resume_file in resume_files]
+    else:
+        resume_paths = list(resume_files)
+    
+    settings = {
+        "fast_triage": st.session_state.fast_triage,
+        "extraction_batch_size": st.session_state.extraction_batch_size,
+        "max_in_flight": st.session_state.max_in_flight,
+        "requests_per_minute": st.session_state.requests_per_minute,
+        "tokens_per_minute": st.session_state.tokens_per_minute,
+        "near_duplicate_threshold": st.session_state.near_duplicate_threshold,
+        "near_duplicate_mode": st.session_state.near_duplicate_mode
+    }
+    processing_job_id = get_worker_pool().submit(
+        st.session_state.job_data, resume_paths, settings, api_key=st.session_state.api_key
+    )
+    st.session_state.processing_job_id = processing_job_id
+    st.success(f"Queued {len(resume_paths)} resumes as processing job {processing_job_id}")
+
+def processing_jobs_section():
+    """Poll the background job this session submitted and list recent jobs"""
+    import pandas as pd
+    queue = JobQueue(st.session_state.db)
+    processing_job_id = st.session_state.processing_job_id
+    
+    if processing_job_id is not None:
+        job = queue.get_job(processing_job_id)
+        st.subheader(f"Processing Job {processing_job_id}")
+        st.progress(min(max(job["progress"] or 0.0, 0.0), 1.0))
+        st.write(f"**Status:** {job['status']} - {job['stage'] or ''}")
+        st.caption(", ".join(f"{count} {status}" for status, count in sorted(job["item_counts"].items())))
         
-        try:
-            # Construct full path if not using temp files
-            if not is_temp:
-                resume_path = os.path.join("Dataset", "CVs1", resume_file)
-            else:
-                resume_path = resume_file
-            
-            # Extract resume information
-            resume_data = resume_agent.process_resume_file(resume_path)
-            
-            if "error" in resume_data:
-                st.error(f"Error processing {resume_file}: {resume_data['error']}")
-                continue
-            
-            # Calculate similarity score
-            similarity_score = similarity_calculator.calculate_similarity(job_data, resume_data)
-            
-            # Store candidate in database
-            db = st.session_state.db
-            candidate_id = db.add_candidate(
-                cv_filename=os.path.basename(resume_path),
-                name=resume_data.get("name"),
-                email=resume_data.get("email"),
-                phone=resume_data.get("phone"),
-                extracted_data=resume_data
-            )
-            
-            # Only proceed with recruiting evaluation if similarity score is high enough
-            recruiting_score = None
-            if similarity_score >= 8.0:
-                # Evaluate candidate with recruiting agent
-                recruiting_score = recruiting_agent.evaluate_candidate(job_data, resume_data)
-            
-            # Store evaluation in database
-            eval_id = db.add_evaluation(
-                candidate_id=candidate_id,
-                job_id=1,  # Assuming job ID 1 for simplicity
-                similarity_score=similarity_score
-            )
-            
-            if recruiting_score:
-                db.update_evaluation(
-                    eval_id=eval_id,
-                    recruiting_score=recruiting_score.get("overall_score"),
-                    final_score=(similarity_score + recruiting_score.get("overall_score", 0)) / 2
-                )
-            
-            # Add to candidates list
-            candidate = {
-                "id": candidate_id,
-                "eval_id": eval_id,
-                "filename": os.path.basename(resume_path),
-                "data": resume_data,
-                "similarity_score": similarity_score,
-                "recruiting_score": recruiting_score
-            }
-            candidates.append(candidate)
-            
-        except Exception as e:
-            st.error(f"Error processing {resume_file}: {str(e)}")
+        with st.expander("Resumes"):
+            st.dataframe(pd.DataFrame(queue.get_items(processing_job_id)).drop(columns=["result"]).set_index("position"))
         
-        # Update progress
-        progress_bar.progress((i + 1) / len(resume_files))
-    
-    # Store candidates in session state
-    st.session_state.candidates = candidates
-    
-    status_text.text(f"Processed {len(candidates)} resumes successfully!")
-    st.success("Resume processing complete!")
+        if job["status"] == "failed" or job["item_counts"].get("failed"):
+            if job["status"] == "failed":
+                st.error(f"Processing failed: {job['error']}")
+            # Checkpoints keep every finished stage, so resuming only repeats the missing work
+            if st.button("Resume run"):
+                resume_run(processing_job_id)
+        if job["status"] == "completed" and st.session_state.loaded_processing_job_id != processing_job_id:
+            # Results come from the database, so they survive reruns and can be loaded by any session
+            st.session_state.candidates = queue.get_results(processing_job_id)
+            st.session_state.loaded_processing_job_id = processing_job_id
+            st.success("Resume processing complete!")
+        
+        # Streamlit has no push updates: rerun the script until the job finishes (any interaction interrupts the wait)
+        if job["status"] in ("queued", "running") and st.checkbox("Auto-refresh", value=True):
+            time.sleep(2)
+            st.experimental_rerun()
+    
+    jobs = queue.list_jobs(limit=10)
+    if jobs:
+        with st.expander("Recent Processing Jobs"):
+            st.dataframe(pd.DataFrame(jobs)[["id", "job_id", "status", "stage", "progress", "total_items", "worker"]].set_index("id"))
+            run_id = st.number_input("Run ID", min_value=1, value=jobs[0]["id"], step=1)
+            if st.button("Resume selected run"):
+                resume_run(int(run_id))
+
+def resume_run(processing_job_id):
+    """Requeue a failed or interrupted run from its checkpoints and follow it on this page"""
+    if get_worker_pool().resume(processing_job_id, api_key=st.session_state.api_key):
+        st.session_state.processing_job_id = processing_job_id
+        st.session_state.loaded_processing_job_id = None
+        st.success(f"Resuming run {processing_job_id} from its checkpoints")
+    else:
+        st.warning(f"Run {processing_job_id} cannot be resumed: it is queued or running, or has nothing left to retry")
 
 def view_results_page():
+    import pandas as pd
+    from agents.similarity import SimilarityScoreCalculator
+    
     st.header("View Results")
     
     # Check if candidates are processed
@@ -342,7 +436,7 @@ def view_results_page():
     st.subheader("Candidates")
     
     # Create tabs for different views
-    tabs = st.tabs(["All Candidates", "Similarity Scores", "Recruiting Scores"])
+    tabs = st.tabs(["All Candidates", "Similarity Scores", "Recruiting Scores", "Requirement Coverage"])
     
     with tabs[0]:
         for i, candidate in enumerate(st.session_state.candidates):
@@ -380,6 +474,87 @@ def view_results_page():
         ])
         
         st.bar_chart(recruiting_df.set_index("Candidate"))
+    
+    with tabs[3]:
+        # Score every key requirement against the whole pool in one TF-IDF fit
+        requirements = job_data.get("key_requirements", [])
+        if requirements:
+            similarity_calculator = SimilarityScoreCalculator()
+            coverage = similarity_calculator.requirement_match_matrix(
+                job_data, [c['data'] for c in st.session_state.candidates]
+            )
+            coverage_df = pd.DataFrame(
+                coverage,
+                index=requirements,
+                columns=[f"{i+1}. {c['data'].get('name', 'Unknown')}" for i, c in enumerate(st.session_state.candidates)]
+            )
+            st.dataframe(coverage_df.round(2))
+        else:
+            st.write("No key requirements available for this job")
+
+def search_candidates_page():
+    import pandas as pd
+    from agents.similarity import SimilarityScoreCalculator
+    
+    st.header("Search Candidates")
+    
+    db = st.session_state.db
+    
+    # Search the whole candidate history, or only candidates evaluated for one job
+    jobs = db.get_all_job_descriptions()
+    job_options = {"All jobs": None}
+    job_options.update({f"{job.id}. {job.title}": job.id for job in jobs})
+    selected_job = st.selectbox("Job", list(job_options))
+    
+    query = st.text_input("Search resumes, skills, job titles and companies", placeholder="e.g. python machine learning")
+    limit = st.slider("Maximum results", 10, 500, 50)
+    
+    if query:
+        start = time.perf_counter()
+        results = db.search_candidates(query, job_id=job_options[selected_job], limit=limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        st.caption(f"{len(results)} candidates in {elapsed_ms:.1f} ms")
+        if results:
+            st.dataframe(pd.DataFrame(results).set_index("id"))
+    
+    # Rank the whole stored pool against the current job from the term index, without parsing or LLM calls
+    st.subheader("Best Matches for Current Job")
+    term_index = get_term_index()
+    if st.button("Index stored candidates"):
+        with st.spinner("Indexing stored candidates..."):
+            similarity_calculator = SimilarityScoreCalculator(term_index=term_index)
+            batch = {}
+            for row in db.iter_candidates(include_extracted_data=True):
+                batch[row["id"]] = row["extracted_data"]
+                if len(batch) == 5000:
+                    similarity_calculator.index_resumes(batch)
+                    batch = {}
+            similarity_calculator.index_resumes(batch)
+    st.caption(f"{len(term_index)} candidates indexed")
+    
+    job_data = st.session_state.job_data
+    if not job_data:
+        st.info("Select or upload a job description to rank stored candidates against it")
+        return
+    
+    k = st.slider("Top candidates", 10, 500, 50, key="top_k")
+    start = time.perf_counter()
+    matches = SimilarityScoreCalculator(term_index=term_index).retrieve_top_k(job_data, k)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    st.caption(f"Top {len(matches)} of {len(term_index)} candidates for {job_data.get('job_title', 'Unknown')} in {elapsed_ms:.1f} ms")
+    if matches:
+        names = db.get_candidate_summaries([candidate_id for candidate_id, _ in matches])
+        st.dataframe(pd.DataFrame([
+            {
+                "id": candidate_id,
+                "name": names.get(candidate_id, {}).get("name"),
+                "cv_filename": names.get(candidate_id, {}).get("cv_filename"),
+                "similarity_score": round(score, 2)
+            }
+            for candidate_id, score in matches
+        ]).set_index("id"))
 
 def shortlist_candidates_page():
     st.header("Shortlist Candidates")
@@ -394,7 +569,7 @@ def shortlist_candidates_page():
     st.subheader(f"Job: {job_data.get('job_title', 'Unknown')}")
     
     # Initialize shortlisting agent
-    shortlisting_agent = ShortlistingAgent()
+    shortlisting_agent = get_shortlisting_agent()
     
     # Shortlist candidates
     if st.button("Shortlist Candidates"):
@@ -402,20 +577,19 @@ def shortlist_candidates_page():
             result = shortlisting_agent.shortlist_candidates(st.session_state.candidates, job_data)
             st.session_state.processed_candidates = result
             
-            # Update database
+            # Update database in a single transaction
             db = st.session_state.db
-            for candidate in result["shortlisted"]:
-                db.update_evaluation(
-                    eval_id=candidate["eval_id"],
-                    shortlisted=True
-                )
-            
-            for candidate in result["rejected"]:
-                db.update_evaluation(
-                    eval_id=candidate["eval_id"],
-                    shortlisted=False,
-                    rejection_reason=candidate.get("shortlisting_reason", "")
-                )
+            db.update_evaluations_bulk(
+                [{"eval_id": candidate["eval_id"], "shortlisted": True} for candidate in result["shortlisted"]] +
+                [
+                    {
+                        "eval_id": candidate["eval_id"],
+                        "shortlisted": False,
+                        "rejection_reason": candidate.get("shortlisting_reason", "")
+                    }
+                    for candidate in result["rejected"]
+                ]
+            )
             
             st.success(f"Shortlisted {len(result['shortlisted'])} candidates, rejected {len(result['rejected'])} candidates")
     
@@ -459,22 +633,24 @@ def generate_emails_page():
     job_data = st.session_state.job_data
     st.subheader(f"Job: {job_data.get('job_title', 'Unknown')}")
     
-    # Initialize interview scheduler agent
-    scheduler_agent = InterviewSchedulerAgent(api_key=st.session_state.api_key)
+    # Get the shared interview scheduler agent
+    scheduler_agent = get_interview_scheduler(st.session_state.api_key)
     
     # Generate emails
     if st.button("Generate Emails"):
         with st.spinner("Generating emails..."):
             result = scheduler_agent.process_candidates(job_data, st.session_state.processed_candidates)
             
-            # Update database
+            # Update database in a single transaction
             db = st.session_state.db
-            for candidate in result["shortlisted"]:
-                db.update_evaluation(
-                    eval_id=candidate["eval_id"],
-                    interview_scheduled=True,
-                    interview_details=candidate.get("invitation", {})
-                )
+            db.update_evaluations_bulk([
+                {
+                    "eval_id": candidate["eval_id"],
+                    "interview_scheduled": True,
+                    "interview_details": candidate.get("invitation", {})
+                }
+                for candidate in result["shortlisted"]
+            ])
             
             st.success(f"Generated emails for {len(result['shortlisted'])} shortlisted candidates and {len(result['rejected'])} rejected candidates")
             
@@ -0,0 +1,68 @@
+"""Memory benchmark for the streaming Database readers.
+
+Fills a fresh database with one job's evaluations (each candidate carrying an
+extracted_data blob) and compares peak Python memory and wall time of
+get_candidates_for_job, which loads full ORM objects at once, with
+iter_candidates and iter_evaluations, which page through projected columns.
+
+Usage:
+    python -m benchmarks.bench_db_streaming [--evaluations 100000] [--blob-bytes 2000] [--chunk-size 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db import Database
+
+def populate(db, evaluations, blob_bytes, batch_size=5000):
+    job_id = db.add_job_description("Benchmark job", "Synthetic job description")
+    for start in range(0, evaluations, batch_size):
+        count = min(batch_size, evaluations - start)
+        candidate_ids = db.add_candidates_bulk([
+            {
+                "cv_filename": f"{start + i}.pdf",
+                "name": f"Candidate {start + i}",
+                "content_hash": f"{start + i:064d}",
+                "extracted_data": {"skills": ["python", "sql"], "summary": "x" * blob_bytes}
+            }
+            for i in range(count)
+        ])
+        db.add_evaluations_bulk([
+            {"candidate_id": candidate_id, "job_id": job_id, "similarity_score": (candidate_id % 100) / 10}
+            for candidate_id in candidate_ids
+        ])
+    return job_id
+
+def measure(name, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<28} {count:>8} rows   peak {peak / 2**20:8.1f} MiB   {elapsed:6.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--evaluations", type=int, default=100000)
+    parser.add_argument("--blob-bytes", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        start = time.perf_counter()
+        job_id = populate(db, args.evaluations, args.blob_bytes)
+        print(f"Populated {args.evaluations} evaluations in {time.perf_counter() - start:.1f} s\n")
+
+        measure("get_candidates_for_job", lambda: len(db.get_candidates_for_job(job_id)))
+        measure("iter_candidates", lambda: sum(1 for _ in db.iter_candidates(job_id=job_id, chunk_size=args.chunk_size)))
+        measure("iter_evaluations", lambda: sum(1 for _ in db.iter_evaluations(job_id=job_id, chunk_size=args.chunk_size)))
+        db.engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Cold-start import profile for the Streamlit app (`python -X importtime`).
+
+Streamlit executes app.py on the first page load, after the server process has
+already imported streamlit, so time to first render is dominated by app.py's
+module-level imports. This runs those imports (read from app.py, minus
+streamlit) in fresh interpreters under -X importtime, reports the median total
+against a cold-start target with the slowest top-level imports, and flags heavy
+dependencies that belong to individual pages rather than the cold start.
+Exits non-zero if the target is missed or a heavy dependency is loaded.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--target 0.5] [--top 10]
+    python -m benchmarks.bench_import_time --modules agents.similarity pipeline.worker
+"""
+import argparse
+import ast
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-start budget for app.py's own imports, in seconds
+TARGET_SECONDS = 0.5
+
+# Loaded by the pages that need them (LLM agents, PDF parsing, TF-IDF, tables), never on the first render
+HEAVY_MODULES = ("langchain", "langchain_groq", "langchain_community", "pypdf", "sklearn", "scipy", "pandas")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+def app_imports(app_path):
+    """Get app.py's module-level import statements as source lines, excluding streamlit"""
+    with open(app_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    statements = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias for alias in node.names if alias.name.split(".")[0] != "streamlit"]
+            if names:
+                statements.append(ast.unparse(ast.Import(names=names)))
+        elif isinstance(node, ast.ImportFrom) and (node.module or "").split(".")[0] != "streamlit":
+            statements.append(ast.unparse(node))
+    return statements
+
+def profile(statements):
+    """Run import statements in a fresh interpreter, returning (module, self_us, cumulative_us, depth) rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "\n".join(statements)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Import failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"))
+    parser.add_argument("--modules", nargs="+", help="Profile these modules instead of app.py's imports")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=TARGET_SECONDS, help="Cold-start target in seconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    statements = [f"import {module}" for module in args.modules] if args.modules else app_imports(args.app)
+    print("Profiling:\n    " + "\n    ".join(statements) + "\n")
+
+    totals = []
+    runs = []
+    for _ in range(args.runs):
+        rows = profile(statements)
+        runs.append(rows)
+        # Top-level rows are the only ones not nested in another import, so their cumulative times add up
+        totals.append(sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1e6)
+    total = statistics.median(totals)
+
+    # Report the median run's slowest top-level imports (Python's own startup modules included)
+    rows = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for module, self_us, cumulative_us, _ in sorted((row for row in rows if row[3] == 0), key=lambda row: -row[2])[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module}")
+
+    loaded = sorted({module.split(".")[0] for module, _, _, _ in rows} & set(HEAVY_MODULES))
+    print(f"\nImport time: median {total:.3f} s over {args.runs} runs (min {min(totals):.3f} s, target {args.target:.3f} s)")
+    if loaded:
+        print(f"Heavy dependencies loaded: {', '.join(loaded)}")
+
+    if args.modules is None and (total > args.target or loaded):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Latency benchmark for top-k retrieval from the persistent term index.
+
+Indexes synthetic extracted resumes (skills, titles and Zipf-distributed
+experience text) and compares SimilarityScoreCalculator.retrieve_top_k, which
+reads only the job description's posting lists, with score_batch over the whole
+pool, which refits TF-IDF on every resume. Reports how many of the top k agree.
+
+Usage:
+    python -m benchmarks.bench_retrieval [--candidates 200000] [--k 50] [--queries 5]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.similarity import SimilarityScoreCalculator
+from utils.inverted_index import InvertedIndex
+
+SKILLS = [
+    "python", "java", "sql", "machine learning", "deep learning", "react", "aws", "docker", "kubernetes", "spark",
+    "tableau", "excel", "pandas", "tensorflow", "pytorch", "nlp", "javascript", "go", "rust", "terraform"
+]
+TITLES = ["software engineer", "data scientist", "data analyst", "devops engineer", "product manager", "ml engineer"]
+
+def synthetic_resume(rng, vocabulary, weights):
+    return {
+        "skills": rng.sample(SKILLS, rng.randint(3, 8)),
+        "experience": [
+            {"title": rng.choice(TITLES), "company": f"company{rng.randint(1, 5000)}",
+             "description": " ".join(rng.choices(vocabulary, weights, k=40))}
+            for _ in range(rng.randint(1, 3))
+        ],
+        "education": [{"degree": "bachelor computer science", "institution": f"university{rng.randint(1, 500)}"}]
+    }
+
+def synthetic_job(rng, vocabulary, weights):
+    return {
+        "job_title": rng.choice(TITLES),
+        "summary": " ".join(rng.choices(vocabulary, weights, k=30)),
+        "key_requirements": rng.sample(SKILLS, 5)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=200000)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(30000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    resumes = [synthetic_resume(rng, vocabulary, weights) for _ in range(args.candidates)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        calculator = SimilarityScoreCalculator(term_index=InvertedIndex(os.path.join(tmp, "term_index.db")))
+        start = time.perf_counter()
+        for offset in range(0, len(resumes), args.batch_size):
+            calculator.index_resumes({
+                offset + i + 1: resume for i, resume in enumerate(resumes[offset:offset + args.batch_size])
+            })
+        print(f"Indexed {args.candidates} resumes in {time.perf_counter() - start:.1f} s\n")
+
+        for _ in range(args.queries):
+            job = synthetic_job(rng, vocabulary, weights)
+
+            start = time.perf_counter()
+            top = calculator.retrieve_top_k(job, args.k)
+            retrieve_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            scores = calculator.score_batch(job, resumes)
+            batch_ms = (time.perf_counter() - start) * 1000
+            expected = {int(i) + 1 for i in np.argsort(-scores, kind="stable")[:args.k]}
+
+            overlap = len(expected & {candidate_id for candidate_id, _ in top})
+            print(f"retrieve_top_k {retrieve_ms:8.1f} ms   score_batch {batch_ms:8.1f} ms   top-{args.k} overlap {overlap}/{args.k}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,41 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload, sessionmaker
 import os
+import json
+from .engine import create_database_engine
+from .migrations import migrate
 from .models import Base, JobDescription, Candidate, CandidateEvaluation
+from utils.helpers import normalize_email, normalize_phone
+from . import search, skills
+
+# Columns returned by the streaming readers; extracted_data blobs are only loaded on request
+CANDIDATE_SUMMARY_COLUMNS = (Candidate.id, Candidate.cv_filename, Candidate.name, Candidate.email, Candidate.phone)
+EVALUATION_SUMMARY_COLUMNS = (
+    CandidateEvaluation.id.label("eval_id"),
+    CandidateEvaluation.candidate_id,
+    CandidateEvaluation.job_id,
+    CandidateEvaluation.similarity_score,
+    CandidateEvaluation.recruiting_score,
+    CandidateEvaluation.final_score,
+    CandidateEvaluation.shortlisted,
+    CandidateEvaluation.interview_scheduled
+)
+
+# Candidate columns filled by extraction; a re-processed CV that lacks one keeps the stored value
+CANDIDATE_EXTRACTED_COLUMNS = ("name", "email", "phone", "extracted_data", "email_normalized", "phone_normalized")
+
+# Dialects whose INSERT supports ON CONFLICT ... DO UPDATE
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert
+}
 
 class Database:
-    def __init__(self, db_path='sqlite:///recruitment.db'):
-        """Initialize database connection"""
-        self.engine = create_engine(db_path)
-        Base.metadata.create_all(self.engine)
+    def __init__(self, db_path=None, **engine_options):
+        """Initialize database connection (db_path defaults to the DATABASE_URL environment variable, then recruitment.db)"""
+        self.engine = create_database_engine(db_path, **engine_options)
+        migrate(self.engine)
         self.Session = sessionmaker(bind=self.engine)
         
     def get_session(self):
@@ -30,52 +58,123 @@ class Database:
         finally:
             session.close()
     
-    def add_candidate(self, cv_filename, name=None, email=None, phone=None, extracted_data=None):
-        """Add a new candidate to the database"""
+    def add_candidate(self, cv_filename, name=None, email=None, phone=None, extracted_data=None, content_hash=None):
+        """Add a candidate, or update the existing one with the same content hash"""
+        return self.add_candidates_bulk([{
+            "cv_filename": cv_filename,
+            "name": name,
+            "email": email,
+            "phone": phone,
+            "extracted_data": extracted_data,
+            "content_hash": content_hash
+        }])[0]
+    
+    def add_evaluation(self, candidate_id, job_id, similarity_score=None):
+        """Add a candidate evaluation, or update the existing one for the same candidate and job"""
+        return self.add_evaluations_bulk([{
+            "candidate_id": candidate_id,
+            "job_id": job_id,
+            "similarity_score": similarity_score
+        }])[0]
+    
+    def update_evaluation(self, eval_id, **kwargs):
+        """Update an existing evaluation"""
         session = self.get_session()
         try:
-            candidate = Candidate(cv_filename=cv_filename, name=name, email=email, phone=phone)
-            if extracted_data:
-                candidate.set_extracted_data(extracted_data)
-            session.add(candidate)
+            eval = session.query(CandidateEvaluation).filter_by(id=eval_id).first()
+            if not eval:
+                raise ValueError(f"Evaluation with ID {eval_id} not found")
+            
+            for key, value in self._evaluation_values(kwargs).items():
+                setattr(eval, key, value)
+            
             session.commit()
-            return candidate.id
+            return True
         except Exception as e:
             session.rollback()
             raise e
         finally:
             session.close()
     
-    def add_evaluation(self, candidate_id, job_id, similarity_score=None):
-        """Add a new candidate evaluation"""
+    def add_candidates_bulk(self, candidates):
+        """Upsert many candidates in one transaction, returning their IDs in input order
+        
+        Candidates with a content_hash already in the database are updated in place instead of duplicated;
+        extracted fields given as None keep their stored values. Skills and certifications are normalised
+        into their own tables, and an optional resume_text is added to the full-text search index alongside
+        the extracted fields.
+        """
+        if not candidates:
+            return []
+        
+        rows = [
+            {
+                "cv_filename": candidate.get("cv_filename"),
+                "name": candidate.get("name"),
+                "email": candidate.get("email"),
+                "phone": candidate.get("phone"),
+                "extracted_data": json.dumps(candidate["extracted_data"]) if candidate.get("extracted_data") else None,
+                "content_hash": candidate.get("content_hash"),
+                "email_normalized": normalize_email(candidate.get("email")),
+                "phone_normalized": normalize_phone(candidate.get("phone"))
+            }
+            for candidate in candidates
+        ]
+        
         session = self.get_session()
         try:
-            eval = CandidateEvaluation(
-                candidate_id=candidate_id,
-                job_id=job_id,
-                similarity_score=similarity_score
+            # Derived tables are built from the stored rows, which keep earlier values for missing fields
+            stored = self._upsert(
+                session, Candidate, rows, ["content_hash"], keep_stored=CANDIDATE_EXTRACTED_COLUMNS,
+                returning=[Candidate.name, Candidate.extracted_data]
             )
-            session.add(eval)
+            skills.replace_candidate_fields(session.connection(), {row.id: row.extracted_data for row in stored})
+            if self.engine.dialect.name == "sqlite":
+                search.index_candidates(session.connection(), [
+                    (row.id, search.search_document(row.name, row.extracted_data, candidate.get("resume_text")))
+                    for row, candidate in zip(stored, candidates)
+                ])
             session.commit()
-            return eval.id
+            return [row.id for row in stored]
         except Exception as e:
             session.rollback()
             raise e
         finally:
             session.close()
     
-    def update_evaluation(self, eval_id, **kwargs):
-        """Update an existing evaluation"""
+    def add_evaluations_bulk(self, evaluations):
+        """Upsert many candidate evaluations in one transaction, returning their IDs in input order
+        
+        An existing evaluation for the same candidate and job has its scores replaced, including scores
+        that are now None (e.g. no recruiting evaluation); its shortlisting and interview state is kept.
+        """
+        if not evaluations:
+            return []
+        
+        columns = ("candidate_id", "job_id", "similarity_score", "recruiting_score", "final_score")
+        rows = [{column: evaluation.get(column) for column in columns} for evaluation in evaluations]
+        
         session = self.get_session()
         try:
-            eval = session.query(CandidateEvaluation).filter_by(id=eval_id).first()
-            if not eval:
-                raise ValueError(f"Evaluation with ID {eval_id} not found")
-            
-            for key, value in kwargs.items():
-                if hasattr(eval, key):
-                    setattr(eval, key, value)
-            
+            ids = [row.id for row in self._upsert(session, CandidateEvaluation, rows, ["candidate_id", "job_id"])]
+            session.commit()
+            return ids
+        except Exception as e:
+            session.rollback()
+            raise e
+        finally:
+            session.close()
+    
+    def update_evaluations_bulk(self, updates):
+        """Update many evaluations in one transaction; each update is a dict with eval_id plus the columns to set"""
+        if not updates:
+            return True
+        
+        rows = [{"id": update_values["eval_id"], **self._evaluation_values(update_values)} for update_values in updates]
+        
+        session = self.get_session()
+        try:
+            session.execute(update(CandidateEvaluation), rows)
             session.commit()
             return True
         except Exception as e:
@@ -84,6 +183,57 @@ class Database:
         finally:
             session.close()
     
+    def _upsert(self, session, model, rows, conflict_columns, keep_stored=(), returning=()):
+        """INSERT ... ON CONFLICT DO UPDATE rows keyed on a unique index, returning (id, *returning) rows in input order
+        
+        Columns in keep_stored are only overwritten by values that are not None; the others are always replaced.
+        """
+        dialect = self.engine.dialect.name
+        if dialect not in UPSERT_INSERTS:
+            raise NotImplementedError(f"Upserts are not supported for the {dialect} dialect")
+        
+        # A statement may only touch each conflicting row once, so merge rows with the same key (later rows win)
+        positions = {}
+        unique_rows = []
+        row_positions = []
+        for row in rows:
+            key = tuple(row[column] for column in conflict_columns)
+            if None in key:
+                row_positions.append(len(unique_rows))
+                unique_rows.append(row)
+            elif key in positions:
+                previous = unique_rows[positions[key]]
+                unique_rows[positions[key]] = {
+                    column: previous[column] if value is None and column in keep_stored else value
+                    for column, value in row.items()
+                }
+                row_positions.append(positions[key])
+            else:
+                positions[key] = len(unique_rows)
+                row_positions.append(len(unique_rows))
+                unique_rows.append(row)
+        
+        table = model.__table__
+        statement = UPSERT_INSERTS[dialect](model)
+        statement = statement.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={
+                column: func.coalesce(statement.excluded[column], table.c[column]) if column in keep_stored else statement.excluded[column]
+                for column in unique_rows[0] if column not in conflict_columns
+            }
+        ).returning(model.id, *returning, sort_by_parameter_order=True)
+        
+        stored = session.execute(statement, unique_rows).all()
+        return [stored[position] for position in row_positions]
+    
+    def _evaluation_values(self, values):
+        """Keep only evaluation columns, serialising interview details to JSON"""
+        columns = CandidateEvaluation.__table__.columns.keys()
+        result = {key: value for key, value in values.items() if key in columns and key != "id"}
+        if isinstance(result.get("interview_details"), dict):
+            result["interview_details"] = json.dumps(result["interview_details"])
+        return result
+    
     def get_job_description(self, job_id):
         """Get job description by ID"""
         session = self.get_session()
@@ -117,18 +267,18 @@ class Database:
             session.close()
     
     def get_all_candidates(self):
-        """Get all candidates"""
+        """Get all candidates (use iter_candidates for large pools)"""
         session = self.get_session()
         try:
-            return session.query(Candidate).all()
+            return session.query(Candidate).options(selectinload(Candidate.evaluations)).all()
         finally:
             session.close()
     
     def get_candidates_for_job(self, job_id):
-        """Get all candidates evaluated for a specific job"""
+        """Get all candidates evaluated for a specific job (use iter_candidates for large pools)"""
         session = self.get_session()
         try:
-            return session.query(Candidate).join(CandidateEvaluation).filter(
+            return session.query(Candidate).options(selectinload(Candidate.evaluations)).join(CandidateEvaluation).filter(
                 CandidateEvaluation.job_id == job_id
             ).all()
         finally:
@@ -138,9 +288,196 @@ class Database:
         """Get all shortlisted candidates for a specific job"""
         session = self.get_session()
         try:
-            return session.query(Candidate).join(CandidateEvaluation).filter(
+            return session.query(Candidate).options(selectinload(Candidate.evaluations)).join(CandidateEvaluation).filter(
                 CandidateEvaluation.job_id == job_id,
                 CandidateEvaluation.shortlisted == True
             ).all()
         finally:
             session.close()
+    
+    def search_candidates(self, query, job_id=None, limit=50):
+        """Full-text search over resume text, skills, job titles and companies, ranked by BM25
+        
+        Returns dicts with id, name, cv_filename, score and snippet; with a job_id, only candidates
+        evaluated for that job are returned, along with their eval_id, scores and shortlisted flag.
+        """
+        if self.engine.dialect.name != "sqlite":
+            raise NotImplementedError("Full-text search requires SQLite FTS5")
+        
+        with self.engine.connect() as connection:
+            return search.search_candidates(connection, query, job_id=job_id, limit=limit)
+    
+    def get_candidates_page(self, job_id=None, shortlisted=None, after_id=None, limit=100, include_extracted_data=False):
+        """Get one page of candidate summaries in candidate ID order, starting after after_id (keyset pagination)
+        
+        Rows are dicts of the candidate summary columns; with a job_id they also carry that job's evaluation
+        columns and can be filtered by shortlisted. Returns (rows, next_after_id), where next_after_id is None
+        on the last page.
+        """
+        if shortlisted is not None and job_id is None:
+            raise ValueError("Filtering by shortlisted requires a job_id")
+        
+        columns = list(CANDIDATE_SUMMARY_COLUMNS)
+        if include_extracted_data:
+            columns.append(Candidate.extracted_data)
+        
+        if job_id is None:
+            query = select(*columns)
+            if after_id is not None:
+                query = query.where(Candidate.id > after_id)
+            query = query.order_by(Candidate.id)
+        else:
+            # Walks the (job_id, candidate_id) index, so every page costs the same however deep it is
+            evaluation_columns = [column for column in EVALUATION_SUMMARY_COLUMNS if column.key != "candidate_id"]
+            query = select(*columns, *evaluation_columns).join(
+                CandidateEvaluation, CandidateEvaluation.candidate_id == Candidate.id
+            ).where(CandidateEvaluation.job_id == job_id)
+            if shortlisted is not None:
+                query = query.where(CandidateEvaluation.shortlisted == shortlisted)
+            if after_id is not None:
+                query = query.where(CandidateEvaluation.candidate_id > after_id)
+            query = query.order_by(CandidateEvaluation.candidate_id)
+        
+        with self.engine.connect() as connection:
+            rows = [dict(row) for row in connection.execute(query.limit(limit)).mappings()]
+        
+        if include_extracted_data:
+            for row in rows:
+                row["extracted_data"] = json.loads(row["extracted_data"]) if row["extracted_data"] else {}
+        
+        next_after_id = rows[-1]["id"] if len(rows) == limit else None
+        return rows, next_after_id
+    
+    def iter_candidates(self, job_id=None, shortlisted=None, include_extracted_data=False, chunk_size=1000):
+        """Stream candidate summaries in bounded memory, fetching chunk_size rows per query"""
+        after_id = None
+        while True:
+            rows, after_id = self.get_candidates_page(
+                job_id=job_id, shortlisted=shortlisted, after_id=after_id, limit=chunk_size,
+                include_extracted_data=include_extracted_data
+            )
+            yield from rows
+            if after_id is None:
+                return
+    
+    def iter_evaluations(self, job_id=None, chunk_size=1000):
+        """Stream evaluation score rows (no candidate blobs), chunk_size rows per query
+        
+        Rows come in evaluation ID order, or candidate ID order within a job so the (job_id, candidate_id)
+        index drives the pagination.
+        """
+        if job_id is None:
+            cursor_column, cursor_key = CandidateEvaluation.id, "eval_id"
+        else:
+            cursor_column, cursor_key = CandidateEvaluation.candidate_id, "candidate_id"
+        
+        after = None
+        while True:
+            query = select(*EVALUATION_SUMMARY_COLUMNS)
+            if job_id is not None:
+                query = query.where(CandidateEvaluation.job_id == job_id)
+            if after is not None:
+                query = query.where(cursor_column > after)
+            query = query.order_by(cursor_column).limit(chunk_size)
+            
+            with self.engine.connect() as connection:
+                rows = [dict(row) for row in connection.execute(query).mappings()]
+            
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1][cursor_key]
+    
+    def get_extracted_data(self, candidate_ids):
+        """Load extracted data blobs on demand, as a dict of candidate ID -> extracted data"""
+        candidate_ids = list(candidate_ids)
+        result = {}
+        with self.engine.connect() as connection:
+            for start in range(0, len(candidate_ids), 500):
+                rows = connection.execute(
+                    select(Candidate.id, Candidate.extracted_data).where(Candidate.id.in_(candidate_ids[start:start + 500]))
+                )
+                result.update({row.id: json.loads(row.extracted_data) if row.extracted_data else {} for row in rows})
+        return result
+    
+    def get_candidate_summaries(self, candidate_ids):
+        """Load candidate summary columns for the given IDs, as a dict of candidate ID -> row dict"""
+        candidate_ids = list(candidate_ids)
+        result = {}
+        with self.engine.connect() as connection:
+            for start in range(0, len(candidate_ids), 500):
+                rows = connection.execute(
+                    select(*CANDIDATE_SUMMARY_COLUMNS).where(Candidate.id.in_(candidate_ids[start:start + 500]))
+                ).mappings()
+                result.update({row["id"]: dict(row) for row in rows})
+        return result
+    
+    def find_candidates_by_hash(self, content_hashes):
+        """Find stored candidates by CV content hash, as a dict of hash -> {"id", "extracted_data"}"""
+        content_hashes = list({content_hash for content_hash in content_hashes if content_hash})
+        result = {}
+        with self.engine.connect() as connection:
+            for start in range(0, len(content_hashes), 500):
+                rows = connection.execute(
+                    select(Candidate.content_hash, Candidate.id, Candidate.extracted_data)
+                    .where(Candidate.content_hash.in_(content_hashes[start:start + 500]))
+                )
+                result.update({
+                    row.content_hash: {"id": row.id, "extracted_data": json.loads(row.extracted_data) if row.extracted_data else {}}
+                    for row in rows
+                })
+        return result
+    
+    def find_candidates_by_contact(self, contacts):
+        """Match (email, phone) pairs against stored candidates on normalised email, then phone
+        
+        Returns one {"id", "extracted_data"} dict (or None when there is no match) per pair, in input order.
+        The oldest matching candidate wins when several share a contact key.
+        """
+        contacts = [(normalize_email(email), normalize_phone(phone)) for email, phone in contacts]
+        emails = list({email for email, _ in contacts if email})
+        phones = list({phone for _, phone in contacts if phone})
+        
+        by_email = {}
+        by_phone = {}
+        with self.engine.connect() as connection:
+            for column, keys, found in (
+                (Candidate.email_normalized, emails, by_email),
+                (Candidate.phone_normalized, phones, by_phone)
+            ):
+                for start in range(0, len(keys), 500):
+                    rows = connection.execute(
+                        select(column.label("key"), Candidate.id, Candidate.extracted_data)
+                        .where(column.in_(keys[start:start + 500]))
+                        .order_by(Candidate.id.desc())
+                    )
+                    found.update({
+                        row.key: {"id": row.id, "extracted_data": json.loads(row.extracted_data) if row.extracted_data else {}}
+                        for row in rows
+                    })
+        
+        return [by_email.get(email) or by_phone.get(phone) for email, phone in contacts]
+    
+    def get_candidates_with_skills(self, skill_names, match_all=True, job_id=None):
+        """Get candidates having all (or with match_all=False, any) of the given skills, e.g. {"python", "sql", "aws"}"""
+        return self._get_candidates_by_field("skills", skill_names, match_all, job_id)
+    
+    def get_candidates_with_certifications(self, certification_names, match_all=True, job_id=None):
+        """Get candidates holding all (or with match_all=False, any) of the given certifications"""
+        return self._get_candidates_by_field("certifications", certification_names, match_all, job_id)
+    
+    def get_skill_counts(self, job_id=None, limit=50):
+        """Get the most common skills as (skill, number of candidates) pairs, optionally for one job"""
+        with self.engine.connect() as connection:
+            return [tuple(row) for row in connection.execute(skills.name_counts_query("skills", job_id, limit))]
+    
+    def _get_candidates_by_field(self, field, names, match_all, job_id):
+        query = skills.candidate_ids_query(field, names, match_all=match_all, job_id=job_id)
+        if query is None:
+            return []
+        
+        session = self.get_session()
+        try:
+            return session.query(Candidate).filter(Candidate.id.in_(query)).all()
+        finally:
+            session.close()
@@ -0,0 +1,168 @@
+"""Columnar export of candidate evaluations for analytics.
+
+Streams candidate_evaluations joined with candidates and job_descriptions in
+keyset-paginated chunks and writes one Parquet (or Arrow IPC) file per job:
+
+    <output_dir>/job_id=<id>/evaluations.parquet
+
+job_id is the partition key (read it back with pyarrow.dataset(..., partitioning="hive")
+or pandas.read_parquet), so it is not repeated inside the files. Skills and
+certifications come from the normalised tables as list columns.
+
+Usage:
+    python -m database.export exports/ [--format parquet|arrow] [--job-id 3] [--chunk-size 50000]
+"""
+import argparse
+import os
+from sqlalchemy import select
+from .db import Database
+from .models import Candidate, CandidateCertification, CandidateEvaluation, CandidateSkill, Certification, JobDescription, Skill
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# Exported columns in order: (name, SQL expression)
+EXPORT_COLUMNS = (
+    ("eval_id", CandidateEvaluation.id),
+    ("job_title", JobDescription.title),
+    ("candidate_id", CandidateEvaluation.candidate_id),
+    ("cv_filename", Candidate.cv_filename),
+    ("name", Candidate.name),
+    ("similarity_score", CandidateEvaluation.similarity_score),
+    ("recruiting_score", CandidateEvaluation.recruiting_score),
+    ("final_score", CandidateEvaluation.final_score),
+    ("shortlisted", CandidateEvaluation.shortlisted),
+    ("interview_scheduled", CandidateEvaluation.interview_scheduled),
+    ("rejection_reason", CandidateEvaluation.rejection_reason)
+)
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def export_schema():
+    """Arrow schema of the exported files (job_id is carried by the partition directory)"""
+    pa = _import_pyarrow()
+    return pa.schema([
+        ("eval_id", pa.int64()),
+        ("job_title", pa.string()),
+        ("candidate_id", pa.int64()),
+        ("cv_filename", pa.string()),
+        ("name", pa.string()),
+        ("similarity_score", pa.float64()),
+        ("recruiting_score", pa.float64()),
+        ("final_score", pa.float64()),
+        ("shortlisted", pa.bool_()),
+        ("interview_scheduled", pa.bool_()),
+        ("rejection_reason", pa.string()),
+        ("skills", pa.list_(pa.string())),
+        ("certifications", pa.list_(pa.string()))
+    ])
+
+def _names_by_candidate(connection, association, model, foreign_key, candidate_ids):
+    """List the names linked to each candidate, reading the page's candidate ID range in one query"""
+    names = {candidate_id: [] for candidate_id in candidate_ids}
+    rows = connection.execute(
+        select(association.candidate_id, model.name)
+        .join(model, model.id == foreign_key)
+        .where(association.candidate_id.between(candidate_ids[0], candidate_ids[-1]))
+        .order_by(association.candidate_id, model.name)
+    )
+    for candidate_id, name in rows:
+        if candidate_id in names:
+            names[candidate_id].append(name)
+    return [names[candidate_id] for candidate_id in candidate_ids]
+
+def iter_evaluation_batches(db, job_id, chunk_size=50000):
+    """Yield Arrow record batches of one job's evaluations, chunk_size rows at a time"""
+    pa = _import_pyarrow()
+    schema = export_schema()
+    columns = [column for _, column in EXPORT_COLUMNS]
+    after = None
+
+    while True:
+        # Keyset pagination over the (job_id, candidate_id) index
+        query = (
+            select(*columns)
+            .join(Candidate, Candidate.id == CandidateEvaluation.candidate_id)
+            .join(JobDescription, JobDescription.id == CandidateEvaluation.job_id, isouter=True)
+            .where(CandidateEvaluation.job_id == job_id)
+        )
+        if after is not None:
+            query = query.where(CandidateEvaluation.candidate_id > after)
+        query = query.order_by(CandidateEvaluation.candidate_id).limit(chunk_size)
+
+        with db.engine.connect() as connection:
+            rows = connection.execute(query).all()
+            if not rows:
+                return
+
+            data = dict(zip([name for name, _ in EXPORT_COLUMNS], map(list, zip(*rows))))
+            candidate_ids = data["candidate_id"]
+            data["skills"] = _names_by_candidate(connection, CandidateSkill, Skill, CandidateSkill.skill_id, candidate_ids)
+            data["certifications"] = _names_by_candidate(
+                connection, CandidateCertification, Certification, CandidateCertification.certification_id, candidate_ids
+            )
+
+        yield pa.RecordBatch.from_pydict(data, schema=schema)
+
+        if len(rows) < chunk_size:
+            return
+        after = candidate_ids[-1]
+
+def export_evaluations(db, output_dir, fmt="parquet", job_ids=None, chunk_size=50000, compression="zstd"):
+    """Export evaluations to one file per job under output_dir, returning {job_id: (path, rows)}"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    pa = _import_pyarrow()
+    schema = export_schema()
+
+    if job_ids is None:
+        with db.engine.connect() as connection:
+            job_ids = list(connection.scalars(
+                select(CandidateEvaluation.job_id).where(CandidateEvaluation.job_id.is_not(None))
+                .distinct().order_by(CandidateEvaluation.job_id)
+            ))
+
+    results = {}
+    for job_id in job_ids:
+        partition_dir = os.path.join(output_dir, f"job_id={job_id}")
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, "evaluations" + EXPORT_FORMATS[fmt])
+
+        # Each chunk becomes one row group / record batch, so memory stays bounded by chunk_size
+        if fmt == "parquet":
+            writer = pa.parquet.ParquetWriter(path, schema, compression=compression)
+        else:
+            writer = pa.ipc.new_file(path, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+
+        rows = 0
+        try:
+            for batch in iter_evaluation_batches(db, job_id, chunk_size=chunk_size):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            writer.close()
+        results[job_id] = (path, rows)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--job-id", type=int, action="append", dest="job_ids")
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--db", default=None, help="Database URL (defaults to DATABASE_URL, then sqlite:///recruitment.db)")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    for job_id, (path, rows) in export_evaluations(db, args.output_dir, args.format, args.job_ids, args.chunk_size).items():
+        print(f"job {job_id}: {rows} rows -> {path}")
+
+if __name__ == "__main__":
+    main()
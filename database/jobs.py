@@ -0,0 +1,249 @@
+"""Durable queue of resume processing jobs.
+
+A job snapshots the summarised job description and processing settings and
+lists its resumes as items. Background workers claim queued jobs with a
+conditional UPDATE, so several workers (or server processes) sharing one
+database never run the same job twice, and record each item's outcome as it
+completes. Items also carry stage checkpoints (parsed text, extracted fields,
+similarity and recruiting scores), so a failed, interrupted or requeued run
+resumes where it stopped instead of repeating PDF parsing and LLM calls. Jobs
+whose worker stops sending heartbeats are requeued.
+"""
+import json
+import os
+import time
+from sqlalchemy import func, insert, select, update
+from .models import ProcessingJob, ProcessingJobItem
+
+JOB_SUMMARY_COLUMNS = (
+    ProcessingJob.id, ProcessingJob.job_id, ProcessingJob.status, ProcessingJob.stage, ProcessingJob.progress,
+    ProcessingJob.total_items, ProcessingJob.error, ProcessingJob.worker, ProcessingJob.created_at,
+    ProcessingJob.started_at, ProcessingJob.finished_at
+)
+
+class JobQueue:
+    """Enqueue, claim and track processing jobs stored in the recruitment database"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def enqueue(self, job_data, paths, settings=None):
+        """Queue a batch of resume paths to be processed against a job description, returning the processing job ID"""
+        now = time.time()
+        with self.db.engine.begin() as connection:
+            processing_job_id = connection.execute(
+                insert(ProcessingJob).values(
+                    job_id=job_data.get("job_id"), job_data=json.dumps(job_data), settings=json.dumps(settings or {}),
+                    status="queued", stage="Queued", progress=0.0, total_items=len(paths), created_at=now
+                )
+            ).inserted_primary_key[0]
+            if paths:
+                connection.execute(insert(ProcessingJobItem), [
+                    {
+                        "processing_job_id": processing_job_id, "position": position, "filename": os.path.basename(path),
+                        "path": path, "status": "queued", "updated_at": now
+                    }
+                    for position, path in enumerate(paths)
+                ])
+        return processing_job_id
+
+    def claim(self, worker, processing_job_id=None):
+        """Mark the oldest queued job (or the given one, if queued) as running for this worker and return it, or None"""
+        while True:
+            with self.db.engine.begin() as connection:
+                query = select(ProcessingJob.id, ProcessingJob.job_data, ProcessingJob.settings).where(ProcessingJob.status == "queued")
+                if processing_job_id is not None:
+                    query = query.where(ProcessingJob.id == processing_job_id)
+                row = connection.execute(query.order_by(ProcessingJob.id).limit(1)).first()
+                if row is None:
+                    return None
+
+                # Another worker may have claimed the same row since the SELECT; only one UPDATE matches
+                now = time.time()
+                claimed = connection.execute(
+                    update(ProcessingJob)
+                    .where(ProcessingJob.id == row.id, ProcessingJob.status == "queued")
+                    .values(status="running", worker=worker, started_at=now, heartbeat_at=now, stage="Starting")
+                ).rowcount
+                if not claimed:
+                    continue
+
+                items = connection.execute(
+                    select(ProcessingJobItem.position, ProcessingJobItem.path)
+                    .where(ProcessingJobItem.processing_job_id == row.id).order_by(ProcessingJobItem.position)
+                ).all()
+
+            return {
+                "id": row.id,
+                "worker": worker,
+                "job_data": json.loads(row.job_data) if row.job_data else {},
+                "settings": json.loads(row.settings) if row.settings else {},
+                "paths": [item.path for item in items]
+            }
+
+    def record_items(self, processing_job_id, updates):
+        """Record item outcomes and checkpoints, given as dicts with position and any item columns (stage, extracted_data, ...)"""
+        if not updates:
+            return
+        now = time.time()
+        with self.db.engine.begin() as connection:
+            for values in updates:
+                values = dict(values)
+                position = values.pop("position")
+                for column in ("result", "extracted_data"):
+                    if values.get(column) is not None:
+                        values[column] = json.dumps(values[column])
+                connection.execute(
+                    update(ProcessingJobItem)
+                    .where(ProcessingJobItem.processing_job_id == processing_job_id, ProcessingJobItem.position == position)
+                    .values(updated_at=now, **values)
+                )
+
+    def heartbeat(self, processing_job_id, worker):
+        """Refresh a running job's heartbeat; False if the job is no longer running for this worker"""
+        with self.db.engine.begin() as connection:
+            return bool(connection.execute(
+                update(ProcessingJob)
+                .where(ProcessingJob.id == processing_job_id, ProcessingJob.status == "running", ProcessingJob.worker == worker)
+                .values(heartbeat_at=time.time())
+            ).rowcount)
+
+    def report_progress(self, processing_job_id, stage, progress):
+        """Update a running job's progress message and fraction; doubles as the worker heartbeat"""
+        with self.db.engine.begin() as connection:
+            connection.execute(
+                update(ProcessingJob).where(ProcessingJob.id == processing_job_id)
+                .values(stage=stage, progress=progress, heartbeat_at=time.time())
+            )
+
+    def finish(self, processing_job_id, stage, error=None):
+        """Mark a job completed, or failed when an error is given"""
+        with self.db.engine.begin() as connection:
+            connection.execute(
+                update(ProcessingJob).where(ProcessingJob.id == processing_job_id).values(
+                    status="failed" if error else "completed", stage=stage, error=error,
+                    progress=1.0, finished_at=time.time()
+                )
+            )
+
+    def resume(self, processing_job_id, stale_after=120):
+        """Requeue a failed or interrupted run, or a completed one with failed items, keeping its checkpoints
+
+        Returns False if the job does not exist, is still queued, or is running with a live worker.
+        """
+        with self.db.engine.begin() as connection:
+            job = connection.execute(
+                select(ProcessingJob.status, ProcessingJob.heartbeat_at).where(ProcessingJob.id == processing_job_id)
+            ).first()
+            if job is None or job.status == "queued":
+                return False
+            if job.status == "running" and (job.heartbeat_at or 0) >= time.time() - stale_after:
+                return False
+
+            failed_items = connection.execute(
+                update(ProcessingJobItem)
+                .where(ProcessingJobItem.processing_job_id == processing_job_id, ProcessingJobItem.status == "failed")
+                .values(status="queued", message=None, updated_at=time.time())
+            ).rowcount
+            if job.status == "completed" and not failed_items:
+                return False
+
+            connection.execute(
+                update(ProcessingJob).where(ProcessingJob.id == processing_job_id).values(
+                    status="queued", stage="Queued to resume", error=None, worker=None, finished_at=None
+                )
+            )
+        return True
+
+    def get_checkpoints(self, processing_job_id):
+        """Get the checkpoints of a job's items that got past the queue, as a dict of position -> checkpoint dict"""
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(
+                select(
+                    ProcessingJobItem.position, ProcessingJobItem.status, ProcessingJobItem.message, ProcessingJobItem.stage,
+                    ProcessingJobItem.content_hash,
+                    ProcessingJobItem.resume_text, ProcessingJobItem.extracted_data, ProcessingJobItem.similarity_score,
+                    ProcessingJobItem.candidate_id, ProcessingJobItem.eval_id, ProcessingJobItem.result
+                )
+                .where(
+                    ProcessingJobItem.processing_job_id == processing_job_id,
+                    (ProcessingJobItem.stage != "queued") | (ProcessingJobItem.status == "skipped")
+                )
+            ).mappings()
+            checkpoints = {row["position"]: dict(row) for row in rows}
+        for checkpoint in checkpoints.values():
+            checkpoint["extracted_data"] = json.loads(checkpoint["extracted_data"]) if checkpoint["extracted_data"] else None
+            checkpoint["recruiting_score"] = (json.loads(checkpoint.pop("result")) if checkpoint["result"] else {}).get("recruiting_score")
+        return checkpoints
+
+    def requeue_stale(self, stale_after=120, live_workers=()):
+        """Requeue running jobs whose worker has not sent a heartbeat for stale_after seconds, returning their IDs
+
+        Jobs owned by live_workers (workers known to be running, e.g. in this process) are never requeued.
+        """
+        with self.db.engine.begin() as connection:
+            stale = (
+                (ProcessingJob.status == "running") & (ProcessingJob.heartbeat_at < time.time() - stale_after)
+            )
+            if live_workers:
+                stale &= ProcessingJob.worker.not_in(list(live_workers))
+            stale_ids = list(connection.scalars(select(ProcessingJob.id).where(stale)))
+            if stale_ids:
+                # Re-check the heartbeat in the UPDATE, so a worker that beat since the SELECT keeps its job
+                stale_ids = list(connection.scalars(
+                    update(ProcessingJob).where(ProcessingJob.id.in_(stale_ids), stale)
+                    .values(status="queued", stage="Requeued after worker stopped", worker=None)
+                    .returning(ProcessingJob.id)
+                ))
+        return stale_ids
+
+    def get_job(self, processing_job_id):
+        """Get a job's status with per-status item counts, or None if it does not exist"""
+        with self.db.engine.connect() as connection:
+            row = connection.execute(select(*JOB_SUMMARY_COLUMNS).where(ProcessingJob.id == processing_job_id)).mappings().first()
+            if row is None:
+                return None
+            counts = dict(connection.execute(
+                select(ProcessingJobItem.status, func.count())
+                .where(ProcessingJobItem.processing_job_id == processing_job_id)
+                .group_by(ProcessingJobItem.status)
+            ).all())
+        return dict(row, item_counts=counts)
+
+    def list_jobs(self, limit=20):
+        """Get the most recent jobs, newest first"""
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(select(*JOB_SUMMARY_COLUMNS).order_by(ProcessingJob.id.desc()).limit(limit)).mappings()
+            return [dict(row) for row in rows]
+
+    def get_items(self, processing_job_id):
+        """Get a job's items in submission order"""
+        with self.db.engine.connect() as connection:
+            rows = connection.execute(
+                select(
+                    ProcessingJobItem.position, ProcessingJobItem.filename, ProcessingJobItem.status, ProcessingJobItem.stage,
+                    ProcessingJobItem.message, ProcessingJobItem.candidate_id, ProcessingJobItem.eval_id, ProcessingJobItem.result
+                )
+                .where(ProcessingJobItem.processing_job_id == processing_job_id)
+                .order_by(ProcessingJobItem.position)
+            ).mappings()
+            items = [dict(row) for row in rows]
+        for item in items:
+            item["result"] = json.loads(item["result"]) if item["result"] else None
+        return items
+
+    def get_results(self, processing_job_id):
+        """Rebuild the processed candidates of a job in the shape the app keeps in session state"""
+        items = [item for item in self.get_items(processing_job_id) if item["status"] == "done" and item["candidate_id"]]
+        extracted_data = self.db.get_extracted_data(item["candidate_id"] for item in items)
+        return [
+            {
+                "id": item["candidate_id"],
+                "eval_id": item["eval_id"],
+                "filename": item["filename"],
+                "data": extracted_data.get(item["candidate_id"], {}),
+                "similarity_score": (item["result"] or {}).get("similarity_score", 0.0),
+                "recruiting_score": (item["result"] or {}).get("recruiting_score")
+            }
+            for item in items
+        ]
@@ -0,0 +1,69 @@
+from sqlalchemy import inspect, text
+from utils.helpers import normalize_email, normalize_phone
+from .models import Base, Candidate, CandidateEvaluation, ProcessingJobItem
+from .search import create_search_index
+from .skills import replace_candidate_fields
+
+def _add_missing_columns(connection, table):
+    """Add columns defined on the model but missing from an existing table (nullable columns only), returning their names"""
+    existing = {column["name"] for column in inspect(connection).get_columns(table.name)}
+    added = []
+    for column in table.columns:
+        if column.name not in existing:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            added.append(column.name)
+    return added
+
+def _backfill_contact_keys(connection):
+    """Fill the normalised email and phone columns of existing candidates"""
+    rows = connection.execute(text("SELECT id, email, phone FROM candidates")).all()
+    updates = [
+        {"id": row.id, "email_normalized": normalize_email(row.email), "phone_normalized": normalize_phone(row.phone)}
+        for row in rows
+    ]
+    if updates:
+        connection.execute(
+            text("UPDATE candidates SET email_normalized = :email_normalized, phone_normalized = :phone_normalized WHERE id = :id"),
+            updates
+        )
+
+def _remove_duplicate_evaluations(connection):
+    """Keep only the latest evaluation per (candidate_id, job_id) so the unique index can be built"""
+    connection.execute(text(
+        "DELETE FROM candidate_evaluations WHERE id NOT IN ("
+        "SELECT MAX(id) FROM candidate_evaluations GROUP BY candidate_id, job_id)"
+    ))
+
+def _backfill_normalized_fields(connection):
+    """Populate the skills and certifications tables from existing candidates' extracted data"""
+    rows = connection.execute(text("SELECT id, extracted_data FROM candidates WHERE extracted_data IS NOT NULL")).all()
+    for start in range(0, len(rows), 1000):
+        replace_candidate_fields(connection, {row.id: row.extracted_data for row in rows[start:start + 1000]})
+
+def migrate(engine):
+    """Create missing tables, columns and indexes so older recruitment.db files match the current models"""
+    with engine.begin() as connection:
+        existing_tables = set(inspect(connection).get_table_names())
+        Base.metadata.create_all(connection)
+
+        for table in (Candidate.__table__, CandidateEvaluation.__table__, ProcessingJobItem.__table__):
+            if table.name not in existing_tables:
+                continue
+
+            added = _add_missing_columns(connection, table)
+            if "email_normalized" in added:
+                _backfill_contact_keys(connection)
+            existing_indexes = {index["name"] for index in inspect(connection).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                if table is CandidateEvaluation.__table__ and index.unique:
+                    _remove_duplicate_evaluations(connection)
+                index.create(connection)
+
+        if "candidates" in existing_tables and "candidate_skills" not in existing_tables:
+            _backfill_normalized_fields(connection)
+        
+        if connection.dialect.name == "sqlite":
+            create_search_index(connection)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, Index, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 import json
@@ -27,6 +27,11 @@ class JobDescription(Base):
 
 class Candidate(Base):
     __tablename__ = "candidates"
+    __table_args__ = (
+        Index("ix_candidates_content_hash", "content_hash", unique=True),
+        Index("ix_candidates_email_normalized", "email_normalized"),
+        Index("ix_candidates_phone_normalized", "phone_normalized"),
+    )
     
     id = Column(Integer, primary_key=True)
     cv_filename = Column(String)
@@ -34,8 +39,13 @@ class Candidate(Base):
     email = Column(String)
     phone = Column(String)
     extracted_data = Column(Text)  # JSON string of extracted data
+    content_hash = Column(String(64))  # SHA-256 of the CV file, so re-processed CVs map to the same candidate
+    email_normalized = Column(String)  # Contact keys for matching the same person across different files
+    phone_normalized = Column(String)
     
     evaluations = relationship("CandidateEvaluation", back_populates="candidate")
+    skills = relationship("Skill", secondary="candidate_skills", viewonly=True)
+    certifications = relationship("Certification", secondary="candidate_certifications", viewonly=True)
     
     def set_extracted_data(self, data_dict):
         self.extracted_data = json.dumps(data_dict)
@@ -47,6 +57,14 @@ class Candidate(Base):
 
 class CandidateEvaluation(Base):
     __tablename__ = "candidate_evaluations"
+    __table_args__ = (
+        # One evaluation per candidate per job; also serves lookups by candidate
+        Index("ix_candidate_evaluations_candidate_job", "candidate_id", "job_id", unique=True),
+        # Covers get_candidates_for_job, get_shortlisted_candidates and ranking by score within a job
+        Index("ix_candidate_evaluations_job_shortlisted_score", "job_id", "shortlisted", "final_score"),
+        # Keyset pagination through one job's candidates in candidate ID order
+        Index("ix_candidate_evaluations_job_candidate", "job_id", "candidate_id"),
+    )
     
     id = Column(Integer, primary_key=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id"))
@@ -69,3 +87,86 @@ class CandidateEvaluation(Base):
         if self.interview_details:
             return json.loads(self.interview_details)
         return {}
+
+class Skill(Base):
+    __tablename__ = "skills"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)  # Canonical name from utils.skills
+
+class CandidateSkill(Base):
+    __tablename__ = "candidate_skills"
+    __table_args__ = (
+        # skill -> candidates lookups; the primary key already covers candidate -> skills
+        Index("ix_candidate_skills_skill_candidate", "skill_id", "candidate_id"),
+    )
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
+class Certification(Base):
+    __tablename__ = "certifications"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)  # Lowercased, whitespace-normalised name
+
+class CandidateCertification(Base):
+    __tablename__ = "candidate_certifications"
+    __table_args__ = (
+        Index("ix_candidate_certifications_certification_candidate", "certification_id", "candidate_id"),
+    )
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    certification_id = Column(Integer, ForeignKey("certifications.id"), primary_key=True)
+
+class ProcessingJob(Base):
+    """A queued resume batch, run by a background worker outside the Streamlit script"""
+    __tablename__ = "processing_jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index("ix_processing_jobs_status", "status", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, ForeignKey("job_descriptions.id"))
+    job_data = Column(Text)  # JSON snapshot of the summarised job description the batch is scored against
+    settings = Column(Text)  # JSON string of processing settings (fast triage, batch size, deduplication, ...)
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed or failed
+    stage = Column(Text)  # Latest progress message
+    progress = Column(Float, default=0.0)  # 0-1
+    total_items = Column(Integer, default=0)
+    error = Column(Text)
+    worker = Column(String)  # Name of the worker that claimed the job
+    created_at = Column(Float)  # Unix timestamps
+    started_at = Column(Float)
+    heartbeat_at = Column(Float)  # Refreshed while running, so jobs of dead workers can be requeued
+    finished_at = Column(Float)
+    
+    items = relationship("ProcessingJobItem", back_populates="processing_job", order_by="ProcessingJobItem.position")
+
+class ProcessingJobItem(Base):
+    """One resume of a processing job and its outcome"""
+    __tablename__ = "processing_job_items"
+    __table_args__ = (
+        Index("ix_processing_job_items_job_position", "processing_job_id", "position", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    processing_job_id = Column(Integer, ForeignKey("processing_jobs.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    filename = Column(String)
+    path = Column(Text)
+    status = Column(String, nullable=False, default="queued")  # queued, done, skipped or failed
+    message = Column(Text)
+    # Last checkpoint reached (see pipeline.processor.STAGES); a resumed run skips every stage already passed
+    stage = Column(String, default="queued")
+    content_hash = Column(String(64))
+    resume_text = Column(Text)  # Parsed PDF text, cleared once the item is done
+    extracted_data = Column(Text)  # JSON string of the extracted fields
+    similarity_score = Column(Float)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"))
+    eval_id = Column(Integer, ForeignKey("candidate_evaluations.id"))
+    result = Column(Text)  # JSON string of the similarity score and full recruiting evaluation
+    updated_at = Column(Float)
+    
+    processing_job = relationship("ProcessingJob", back_populates="items")
@@ -0,0 +1,133 @@
+from sqlalchemy import text
+import json
+import re
+
+# FTS5 index over candidates; rowid is the candidate ID
+CANDIDATES_FTS_TABLE = "candidates_fts"
+
+# BM25 column weights: name, resume_text, skills, titles, companies
+BM25_WEIGHTS = (2.0, 1.0, 5.0, 3.0, 2.0)
+
+CREATE_CANDIDATES_FTS = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {CANDIDATES_FTS_TABLE} USING fts5(
+    name, resume_text, skills, titles, companies,
+    tokenize = 'porter unicode61'
+)
+"""
+
+# Remove index entries together with their candidate
+CREATE_CANDIDATES_FTS_DELETE_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS candidates_fts_delete AFTER DELETE ON candidates BEGIN
+    DELETE FROM {CANDIDATES_FTS_TABLE} WHERE rowid = old.id;
+END
+"""
+
+def search_document(name, extracted_data, resume_text=None):
+    """Build the indexed columns for one candidate from its extracted data"""
+    if isinstance(extracted_data, str):
+        extracted_data = json.loads(extracted_data) if extracted_data else {}
+    extracted_data = extracted_data or {}
+
+    experience = [item for item in extracted_data.get("experience", []) if isinstance(item, dict)]
+    return {
+        "name": name or extracted_data.get("name") or "",
+        "resume_text": resume_text or "",
+        "skills": " ; ".join(str(skill) for skill in extracted_data.get("skills", []) if skill),
+        "titles": " ; ".join(item["title"] for item in experience if item.get("title")),
+        "companies": " ; ".join(item["company"] for item in experience if item.get("company"))
+    }
+
+def create_search_index(connection):
+    """Create the FTS5 table and its trigger, indexing existing candidates the first time"""
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": CANDIDATES_FTS_TABLE}
+    ).first()
+    connection.execute(text(CREATE_CANDIDATES_FTS))
+    connection.execute(text(CREATE_CANDIDATES_FTS_DELETE_TRIGGER))
+
+    if not exists:
+        rows = connection.execute(text("SELECT id, name, extracted_data FROM candidates")).all()
+        index_candidates(connection, [(row.id, search_document(row.name, row.extracted_data)) for row in rows])
+
+def index_candidates(connection, documents):
+    """Insert or replace the index entries for (candidate_id, document) pairs
+
+    A document without resume text keeps the text already indexed for that candidate. Duplicate IDs
+    (several rows upserted into one candidate) collapse into one entry; the last document wins.
+    """
+    if not documents:
+        return
+
+    # FTS5 rowids are unique, so index each candidate once
+    unique_documents = {}
+    for candidate_id, document in documents:
+        previous = unique_documents.get(candidate_id)
+        if previous is not None and not document["resume_text"]:
+            document = {**document, "resume_text": previous["resume_text"]}
+        unique_documents[candidate_id] = document
+    documents = list(unique_documents.items())
+
+    ids = [candidate_id for candidate_id, _ in documents]
+    existing_text = {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        placeholders = ", ".join(f":id{i}" for i in range(len(chunk)))
+        rows = connection.execute(
+            text(f"SELECT rowid, resume_text FROM {CANDIDATES_FTS_TABLE} WHERE rowid IN ({placeholders})"),
+            {f"id{i}": candidate_id for i, candidate_id in enumerate(chunk)}
+        ).all()
+        existing_text.update({row.rowid: row.resume_text for row in rows})
+        connection.execute(
+            text(f"DELETE FROM {CANDIDATES_FTS_TABLE} WHERE rowid IN ({placeholders})"),
+            {f"id{i}": candidate_id for i, candidate_id in enumerate(chunk)}
+        )
+
+    connection.execute(
+        text(f"INSERT INTO {CANDIDATES_FTS_TABLE} (rowid, name, resume_text, skills, titles, companies) "
+             "VALUES (:rowid, :name, :resume_text, :skills, :titles, :companies)"),
+        [
+            {**document, "rowid": candidate_id, "resume_text": document["resume_text"] or existing_text.get(candidate_id, "")}
+            for candidate_id, document in documents
+        ]
+    )
+
+def build_match_query(query):
+    """Turn free text into an FTS5 query that ANDs every term, quoting terms so punctuation is never syntax"""
+    terms = re.findall(r"[^\s\"]+", query)
+    return " ".join('"' + term + '"' for term in terms)
+
+def search_candidates(connection, query, job_id=None, limit=50):
+    """Rank candidates matching a query by BM25, optionally restricted to those evaluated for a job"""
+    match_query = build_match_query(query)
+    if not match_query:
+        return []
+
+    weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+    params = {"query": match_query, "limit": limit}
+    job_columns = ""
+    job_join = ""
+    if job_id is not None:
+        job_columns = ", e.id AS eval_id, e.similarity_score, e.final_score, e.shortlisted"
+        job_join = "JOIN candidate_evaluations e ON e.candidate_id = c.id AND e.job_id = :job_id"
+        params["job_id"] = job_id
+
+    rows = connection.execute(text(f"""
+        SELECT c.id, c.name, c.cv_filename,
+               bm25({CANDIDATES_FTS_TABLE}, {weights}) AS bm25_score,
+               snippet({CANDIDATES_FTS_TABLE}, -1, '[', ']', '...', 12) AS snippet
+               {job_columns}
+        FROM {CANDIDATES_FTS_TABLE}
+        JOIN candidates c ON c.id = {CANDIDATES_FTS_TABLE}.rowid
+        {job_join}
+        WHERE {CANDIDATES_FTS_TABLE} MATCH :query
+        ORDER BY bm25_score
+        LIMIT :limit
+    """), params).mappings().all()
+
+    results = []
+    for row in rows:
+        result = dict(row)
+        # bm25() is lower-is-better; expose a higher-is-better score
+        result["score"] = -result.pop("bm25_score")
+        results.append(result)
+    return results
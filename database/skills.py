@@ -0,0 +1,113 @@
+from sqlalchemy import delete, func, insert, intersect, select, union
+from sqlalchemy.dialects import postgresql, sqlite
+import json
+from utils.skills import SkillMatcher
+from .models import CandidateCertification, CandidateEvaluation, CandidateSkill, Certification, Skill
+
+# Dictionary table, association table and its foreign key column for each normalised field
+NORMALIZED_FIELDS = {
+    "skills": (Skill, CandidateSkill, CandidateSkill.skill_id),
+    "certifications": (Certification, CandidateCertification, CandidateCertification.certification_id)
+}
+
+_skill_matcher = None
+
+def _get_skill_matcher():
+    global _skill_matcher
+    if _skill_matcher is None:
+        _skill_matcher = SkillMatcher()
+    return _skill_matcher
+
+def normalize_names(field, values):
+    """Canonicalise skill or certification names, dropping blanks and duplicates"""
+    names = []
+    for value in values or []:
+        if not isinstance(value, str) or not value.strip():
+            continue
+        name = _get_skill_matcher().canonicalize(value) if field == "skills" else " ".join(value.lower().split())
+        if name not in names:
+            names.append(name)
+    return names
+
+def _lookup_ids(connection, model, names):
+    """Map names to dictionary IDs, adding names the dictionary does not have yet"""
+    if not names:
+        return {}
+
+    if connection.dialect.name == "postgresql":
+        connection.execute(postgresql.insert(model).on_conflict_do_nothing(), [{"name": name} for name in names])
+    elif connection.dialect.name == "sqlite":
+        connection.execute(sqlite.insert(model).on_conflict_do_nothing(), [{"name": name} for name in names])
+    else:
+        known = set(connection.scalars(select(model.name).where(model.name.in_(names))))
+        missing = [{"name": name} for name in names if name not in known]
+        if missing:
+            connection.execute(insert(model), missing)
+
+    return dict(connection.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+
+def replace_candidate_fields(connection, extracted_by_candidate):
+    """Replace the normalised skills and certifications of candidates from their extracted data
+
+    extracted_by_candidate maps candidate ID to the extracted data dict (or its JSON string).
+    """
+    if not extracted_by_candidate:
+        return
+
+    for field, (model, association, foreign_key) in NORMALIZED_FIELDS.items():
+        names_by_candidate = {}
+        for candidate_id, extracted_data in extracted_by_candidate.items():
+            if isinstance(extracted_data, str):
+                extracted_data = json.loads(extracted_data) if extracted_data else {}
+            names_by_candidate[candidate_id] = normalize_names(field, (extracted_data or {}).get(field))
+
+        ids_by_name = _lookup_ids(connection, model, sorted({name for names in names_by_candidate.values() for name in names}))
+
+        candidate_ids = list(names_by_candidate)
+        for start in range(0, len(candidate_ids), 500):
+            connection.execute(delete(association).where(association.candidate_id.in_(candidate_ids[start:start + 500])))
+
+        rows = [
+            {"candidate_id": candidate_id, foreign_key.key: ids_by_name[name]}
+            for candidate_id, names in names_by_candidate.items()
+            for name in names
+        ]
+        if rows:
+            connection.execute(insert(association), rows)
+
+def candidate_ids_query(field, names, match_all=True, job_id=None):
+    """Build a query for IDs of candidates having all (INTERSECT) or any (UNION) of the given names"""
+    model, association, foreign_key = NORMALIZED_FIELDS[field]
+    names = normalize_names(field, names)
+    if not names:
+        return None
+
+    # One index range scan on (dictionary ID, candidate ID) per name, combined in SQL
+    selects = [
+        select(association.candidate_id)
+        .join(model, model.id == foreign_key)
+        .where(model.name == name)
+        for name in names
+    ]
+    query = selects[0] if len(selects) == 1 else (intersect if match_all else union)(*selects)
+
+    if job_id is not None:
+        subquery = query.subquery()
+        query = (
+            select(subquery.c.candidate_id)
+            .join(CandidateEvaluation, CandidateEvaluation.candidate_id == subquery.c.candidate_id)
+            .where(CandidateEvaluation.job_id == job_id)
+        )
+    return query
+
+def name_counts_query(field, job_id=None, limit=50):
+    """Build a query for the most common skills or certifications and how many candidates have each"""
+    model, association, foreign_key = NORMALIZED_FIELDS[field]
+    query = select(model.name, func.count(association.candidate_id).label("candidates")).join(
+        association, foreign_key == model.id
+    )
+    if job_id is not None:
+        query = query.join(CandidateEvaluation, CandidateEvaluation.candidate_id == association.candidate_id).where(
+            CandidateEvaluation.job_id == job_id
+        )
+    return query.group_by(model.name).order_by(func.count(association.candidate_id).desc()).limit(limit)
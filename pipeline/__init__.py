@@ -0,0 +1 @@
+# Pipeline package initialization
@@ -0,0 +1,241 @@
+"""Headless batch pipeline: screen a whole folder (or CSV list) of CVs without Streamlit.
+
+Summarises the job description, then extracts, scores and evaluates every
+resume, shortlists candidates and optionally drafts interview invitation and
+rejection emails. Progress streams to stderr and one record per candidate is
+written to JSONL or CSV. Each invocation is a checkpointed run, like the app's
+processing jobs: an interrupted run continues with --resume RUN_ID.
+
+Usage:
+    python -m pipeline.cli Dataset/CVs1 --job-title "Software Engineer" [--output results.jsonl]
+    python -m pipeline.cli cvs.csv --job-title "Data Scientist" --jd-file jd.txt --workers 8 --emails --output results.csv
+    python -m pipeline.cli --resume 12 --output results.jsonl
+
+A CSV of resumes needs a "path" column (or lists paths in its first column);
+relative paths are resolved against the CSV's directory.
+"""
+import argparse
+import csv
+import json
+import os
+import socket
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.jd_summarizer import JDSummarizerAgent
+from agents.scheduler import InterviewSchedulerAgent
+from agents.shortlisting import ShortlistingAgent
+from database.db import Database
+from pipeline.worker import WorkerPool
+from utils.rate_limit import RateLimiter, run_concurrently
+
+OUTPUT_FORMATS = ("jsonl", "csv")
+
+# Columns of the CSV output; JSONL records also carry the extracted data and full recruiting evaluation
+CSV_COLUMNS = (
+    "run_id", "candidate_id", "eval_id", "filename", "name", "email", "phone", "similarity_score", "recruiting_score",
+    "final_score", "shortlisted", "shortlisting_reason", "email_subject", "email_body"
+)
+
+def collect_resume_paths(source):
+    """List the PDFs under a directory (recursively, sorted), or the paths listed in a CSV file"""
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+            if name.lower().endswith(".pdf")
+        )
+
+    df = pd.read_csv(source)
+    column = "path" if "path" in df.columns else df.columns[0]
+    base = os.path.dirname(os.path.abspath(source))
+    return [path if os.path.isabs(path) else os.path.join(base, path) for path in df[column].dropna().astype(str)]
+
+def load_job_description(job_title, jd_file=None, jd_csv=None):
+    """Read the job description text from a file, or look the title up in a job description CSV"""
+    if jd_file:
+        with open(jd_file, encoding="utf-8") as f:
+            return f.read()
+
+    df = pd.read_csv(jd_csv, encoding="latin1")
+    matches = df[df["Job Title"].str.strip().str.lower() == job_title.strip().lower()]
+    if matches.empty:
+        raise SystemExit(f"Job title {job_title!r} not found in {jd_csv}")
+    return matches["Job Description"].values[0]
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def draft_emails(scheduler_agent, job_data, shortlisted, rejected, workers):
+    """Draft invitations for shortlisted and rejection emails for rejected candidates concurrently, in place"""
+    tasks = [("invitation", candidate) for candidate in shortlisted] + [("rejection", candidate) for candidate in rejected]
+
+    def draft(task):
+        kind, candidate = task
+        if kind == "invitation":
+            return scheduler_agent.generate_interview_invitation(job_data, candidate)
+        return scheduler_agent.generate_rejection_email_for_candidate(candidate)
+
+    for done, (j, email) in enumerate(run_concurrently(draft, tasks, max_workers=workers), start=1):
+        kind, candidate = tasks[j]
+        candidate[kind] = email
+        if done % 50 == 0 or done == len(tasks):
+            log(f"Drafted {done}/{len(tasks)} emails")
+
+def to_record(run_id, candidate):
+    recruiting = candidate.get("recruiting_score") or {}
+    email = (candidate.get("invitation") or candidate.get("rejection") or {}).get("email", {})
+    data = candidate.get("data") or {}
+    return {
+        "run_id": run_id,
+        "candidate_id": candidate["id"],
+        "eval_id": candidate["eval_id"],
+        "filename": candidate["filename"],
+        "name": data.get("name"),
+        "email": data.get("email"),
+        "phone": data.get("phone"),
+        "similarity_score": candidate["similarity_score"],
+        "recruiting_score": recruiting.get("overall_score"),
+        "final_score": candidate.get("final_score"),
+        "shortlisted": candidate.get("shortlisted"),
+        "shortlisting_reason": candidate.get("shortlisting_reason"),
+        "email_subject": email.get("subject"),
+        "email_body": email.get("body"),
+        "recruiting_evaluation": candidate.get("recruiting_score"),
+        "extracted_data": data
+    }
+
+def write_records(path, fmt, records):
+    """Write records to a JSONL or CSV file (or stdout for "-"), one line per record as they are produced"""
+    f = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+    try:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore") if fmt == "csv" else None
+        if writer:
+            writer.writeheader()
+        for record in records:
+            if writer:
+                writer.writerow(record)
+            else:
+                f.write(json.dumps(record, default=str) + "\n")
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("resumes", nargs="?", help="Directory of PDF resumes, or a CSV listing resume paths")
+    parser.add_argument("--job-title", help="Job title; also selects the description from --jd-csv")
+    parser.add_argument("--jd-file", help="Text file with the job description")
+    parser.add_argument("--jd-csv", default=os.path.join("Dataset", "job_description.csv"))
+    parser.add_argument("--resume", type=int, metavar="RUN_ID", help="Continue an interrupted run from its checkpoints")
+    parser.add_argument("--output", default="-", help="Output file (.jsonl or .csv); defaults to JSONL on stdout")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Output format (defaults to the output file's extension)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent LLM requests")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="PDF parsing processes (defaults to the CPU count)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Resumes per extraction prompt")
+    parser.add_argument("--requests-per-minute", type=int, default=30)
+    parser.add_argument("--tokens-per-minute", type=int, default=30000)
+    parser.add_argument("--fast-triage", action="store_true", help="Rule-based extraction only, no LLM extraction or evaluation")
+    parser.add_argument("--emails", action="store_true", help="Draft invitation and rejection emails")
+    parser.add_argument("--db", default=None, help="Database URL (defaults to DATABASE_URL, then sqlite:///recruitment.db)")
+    args = parser.parse_args()
+
+    if args.resume is None and not (args.resumes and args.job_title):
+        parser.error("resumes and --job-title are required unless --resume is given")
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "jsonl")
+    api_key = os.getenv("CHATGROQ_API_KEY")
+    started = time.perf_counter()
+
+    db = Database(args.db)
+    pool = WorkerPool(db, num_workers=0)
+    worker = f"{socket.gethostname()}:{os.getpid()}:cli"
+
+    if args.resume is not None:
+        run_id = args.resume
+        if not pool.resume(run_id, api_key=api_key):
+            raise SystemExit(f"Run {run_id} cannot be resumed: it does not exist, is queued or running, or has nothing left to retry")
+    else:
+        paths = collect_resume_paths(args.resumes)
+        if not paths:
+            raise SystemExit(f"No resumes found in {args.resumes}")
+
+        job_description = load_job_description(args.job_title, args.jd_file, args.jd_csv)
+        log(f"Summarising job description: {args.job_title}")
+        job_data = JDSummarizerAgent(api_key=api_key).summarize_jd(args.job_title, job_description)
+        job_data["job_title"] = args.job_title
+        job_data["original_description"] = job_description
+        job_data["job_id"] = db.add_job_description(
+            title=args.job_title, description=job_description,
+            summary=job_data.get("summary"), questions=job_data.get("evaluation_questions")
+        )
+
+        settings = {
+            "fast_triage": args.fast_triage,
+            "extraction_batch_size": args.batch_size,
+            "max_in_flight": args.workers,
+            "pdf_workers": args.pdf_workers,
+            "requests_per_minute": args.requests_per_minute,
+            "tokens_per_minute": args.tokens_per_minute
+        }
+        run_id = pool.submit(job_data, paths, settings, api_key=api_key)
+        log(f"Run {run_id}: {len(paths)} resumes (continue an interrupted run with --resume {run_id})")
+
+    job = pool.queue.claim(worker, processing_job_id=run_id)
+    if job is None:
+        raise SystemExit(f"Run {run_id} was claimed by another worker")
+    job_data = job["job_data"]
+    pool.run_job(job, progress_callback=lambda stage, fraction: log(f"[{fraction:6.1%}] {stage}"))
+
+    status = pool.queue.get_job(run_id)
+    log(f"Run {run_id} {status['status']}: {status['stage']}")
+    if status["status"] == "failed":
+        raise SystemExit(f"Error: {status['error']} (continue with --resume {run_id})")
+
+    # Shortlist and record the decisions like the Shortlist Candidates page. Items deduplicated onto the same
+    # candidate share one evaluation, so keep one record per evaluation
+    by_evaluation = {}
+    for candidate in pool.queue.get_results(run_id):
+        by_evaluation.setdefault(candidate["eval_id"], candidate)
+    candidates = list(by_evaluation.values())
+    shortlisting_agent = ShortlistingAgent()
+    for candidate in candidates:
+        recruiting = candidate.get("recruiting_score") or {}
+        candidate["final_score"] = shortlisting_agent.calculate_final_score(candidate["similarity_score"], recruiting.get("overall_score"))
+    result = shortlisting_agent.shortlist_candidates(candidates, job_data)
+    db.update_evaluations_bulk(
+        [
+            {"eval_id": candidate["eval_id"], "shortlisted": True, "final_score": candidate["final_score"]}
+            for candidate in result["shortlisted"]
+        ] +
+        [
+            {
+                "eval_id": candidate["eval_id"], "shortlisted": False, "final_score": candidate["final_score"],
+                "rejection_reason": candidate.get("shortlisting_reason", "")
+            }
+            for candidate in result["rejected"]
+        ]
+    )
+    log(f"Shortlisted {len(result['shortlisted'])} candidates, rejected {len(result['rejected'])}")
+
+    if args.emails:
+        scheduler_agent = InterviewSchedulerAgent(api_key=api_key)
+        scheduler_agent.llm.limiter = RateLimiter(
+            requests_per_minute=args.requests_per_minute, tokens_per_minute=args.tokens_per_minute
+        )
+        draft_emails(scheduler_agent, job_data, result["shortlisted"], result["rejected"], args.workers)
+        db.update_evaluations_bulk([
+            {"eval_id": candidate["eval_id"], "interview_scheduled": True, "interview_details": candidate.get("invitation", {})}
+            for candidate in result["shortlisted"]
+        ])
+
+    write_records(args.output, fmt, (to_record(run_id, candidate) for candidate in candidates))
+
+    elapsed = time.perf_counter() - started
+    log(f"Wrote {len(candidates)} candidates to {args.output} in {elapsed:.1f} s ({len(candidates) / elapsed:.1f} resumes/s)")
+
+if __name__ == "__main__":
+    main()
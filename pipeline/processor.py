@@ -0,0 +1,363 @@
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.recruiting import RecruitingAgent
+from agents.resume_extractor import ResumeExtractorAgent
+from agents.similarity import SimilarityScoreCalculator
+from utils.cache import ExtractionCache
+from utils.helpers import compute_file_hash, mask_pii, normalize_email, normalize_phone
+from utils.inverted_index import InvertedIndex
+from utils.minhash import MinHashLSHIndex
+from utils.rate_limit import RateLimiter, run_concurrently
+
+# Processing settings and their defaults (the app's sidebar controls)
+DEFAULT_SETTINGS = {
+    "fast_triage": False,  # Rule-based extraction only, no LLM calls
+    "extraction_batch_size": 1,  # Resumes per extraction prompt
+    "max_in_flight": 4,  # Concurrent LLM requests
+    "pdf_workers": None,  # PDF parsing processes (defaults to the CPU count)
+    "requests_per_minute": 30,
+    "tokens_per_minute": 30000,
+    "near_duplicate_threshold": 0.8,
+    "near_duplicate_mode": "Merge",  # Merge reuses the stored candidate; Flag only notes the match
+    "similarity_threshold": 8.0  # Minimum similarity score for the LLM recruiting evaluation
+}
+
+# Per-resume checkpoints in order; a resumed run skips every stage an item has already passed
+STAGES = ("queued", "text_extracted", "fields_extracted", "similarity_scored", "recruiting_evaluated", "done")
+
+# on_item(position, status, message=None) with status "skipped" or "failed"
+ItemCallback = Callable[..., None]
+# on_checkpoint(position, stage, **fields) with the item's checkpoint fields (status and result once done)
+CheckpointCallback = Callable[..., None]
+# on_progress(stage message, fraction 0-1)
+ProgressCallback = Callable[[str, float], None]
+
+class BatchProcessor:
+    """Process a batch of resumes against a job description without any UI
+
+    Runs deduplication, PDF parsing, extraction, similarity scoring and the recruiting evaluation,
+    stores candidates and evaluations, and reports per-resume outcomes and progress through callbacks.
+    """
+
+    def __init__(self, db, settings: Optional[Dict[str, Any]] = None, api_key: Optional[str] = None,
+                 extraction_cache: Optional[ExtractionCache] = None, near_duplicate_index: Optional[MinHashLSHIndex] = None,
+                 term_index: Optional[InvertedIndex] = None, rate_limiter: Optional[RateLimiter] = None):
+        """Initialize the agents; shared caches, indexes and rate limiter can be passed in"""
+        self.db = db
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.use_llm = not self.settings["fast_triage"]
+        self.resume_agent = ResumeExtractorAgent(
+            api_key=api_key, cache=extraction_cache, use_llm=self.use_llm, near_duplicate_index=near_duplicate_index
+        )
+        self.similarity_calculator = SimilarityScoreCalculator(term_index=term_index)
+        self.recruiting_agent = RecruitingAgent(api_key=api_key)
+
+        # Share one request/token budget between all concurrent LLM calls
+        self.rate_limiter = rate_limiter or RateLimiter(
+            requests_per_minute=self.settings["requests_per_minute"], tokens_per_minute=self.settings["tokens_per_minute"]
+        )
+        # Applied behind the gateway cache, so cached responses do not spend budget
+        self.resume_agent.llm.limiter = self.rate_limiter
+        self.recruiting_agent.llm.limiter = self.rate_limiter
+
+    def process(self, job_data: Dict[str, Any], resume_paths: List[str], on_item: Optional[ItemCallback] = None,
+                on_progress: Optional[ProgressCallback] = None, checkpoints: Optional[Dict[int, Dict[str, Any]]] = None,
+                on_checkpoint: Optional[CheckpointCallback] = None) -> Dict[str, Any]:
+        """Process resumes, returning the stored candidates and how many were reused from earlier runs
+
+        checkpoints maps positions to the checkpoints an earlier attempt of the same run saved through
+        on_checkpoint (see JobQueue.get_checkpoints); those items resume from their last stage.
+        """
+        on_item = on_item or (lambda position, status, message=None: None)
+        on_progress = on_progress or (lambda stage, fraction: None)
+        on_checkpoint = on_checkpoint or (lambda position, stage, **fields: None)
+        checkpoints = checkpoints or {}
+        db = self.db
+        resume_agent = self.resume_agent
+        max_in_flight = self.settings["max_in_flight"]
+        names = [os.path.basename(resume_path) for resume_path in resume_paths]
+        notes = {}
+
+        stages = ["queued"] * len(resume_paths)
+        content_hashes = [None] * len(resume_paths)
+        resume_texts = [None] * len(resume_paths)
+        existing_ids = [None] * len(resume_paths)
+        extraction_results = [None] * len(resume_paths)
+        similarity_by_item = {}
+        recruiting_by_item = {}
+
+        def checkpoint(i, stage, **fields):
+            # Stages only move forward, so updating a later item's fields never rolls it back
+            stages[i] = max(stages[i], stage, key=STAGES.index)
+            on_checkpoint(i, stages[i], **fields)
+
+        # Restore items checkpointed by an earlier attempt of this run
+        unique = []
+        pending = []
+        for i in range(len(resume_paths)):
+            saved = checkpoints.get(i, {})
+            if saved.get("status") == "skipped":
+                continue
+            stages[i] = saved.get("stage") or "queued"
+            # Items without parsed text (checkpointed by older versions) parse their file again
+            if stages[i] == "text_extracted" and not saved.get("resume_text"):
+                stages[i] = "queued"
+            if stages[i] == "queued":
+                pending.append(i)
+                continue
+
+            unique.append(i)
+            content_hashes[i] = saved.get("content_hash")
+            resume_texts[i] = saved.get("resume_text")
+            existing_ids[i] = saved.get("candidate_id")
+            extraction_results[i] = saved.get("extracted_data")
+            if saved.get("message"):
+                notes[i] = saved["message"]
+            if STAGES.index(stages[i]) >= STAGES.index("similarity_scored"):
+                similarity_by_item[i] = saved.get("similarity_score") or 0.0
+            if STAGES.index(stages[i]) >= STAGES.index("recruiting_evaluated"):
+                recruiting_by_item[i] = saved.get("recruiting_score")
+        resumed = len(unique)
+
+        # Exact duplicates: files already stored as candidates, or repeated within this batch, are not processed again
+        first_by_hash = {content_hashes[i]: i for i in unique if content_hashes[i]}
+        readable = []
+        for i in pending:
+            # A missing or unreadable file (e.g. a temp upload gone before a resume) fails only its own item
+            try:
+                content_hashes[i] = compute_file_hash(resume_paths[i])
+            except OSError as e:
+                on_item(i, "failed", f"Could not read file: {e}")
+                continue
+            readable.append(i)
+        pending = readable
+        stored = db.find_candidates_by_hash([content_hashes[i] for i in pending])
+        reused_by_hash = 0
+
+        for i in pending:
+            content_hash = content_hashes[i]
+            if content_hash in first_by_hash:
+                on_item(i, "skipped", f"Same file as {names[first_by_hash[content_hash]]}")
+                continue
+            first_by_hash[content_hash] = i
+            unique.append(i)
+            if content_hash in stored:
+                existing_ids[i] = stored[content_hash]["id"]
+                extraction_results[i] = stored[content_hash]["extracted_data"]
+                notes[i] = "Reused stored candidate with an identical file"
+                reused_by_hash += 1
+                checkpoint(i, "fields_extracted", content_hash=content_hash, candidate_id=existing_ids[i], extracted_data=extraction_results[i])
+        unique.sort()
+
+        to_parse = [i for i in pending if i in unique and existing_ids[i] is None]
+
+        # Parse the remaining PDFs in parallel worker processes
+        def update_text_progress(done, total):
+            on_progress(f"Extracting text from PDFs: {done}/{total}", 0.0)
+
+        parsed_texts = resume_agent.extract_texts_from_pdfs(
+            [resume_paths[i] for i in to_parse], max_workers=self.settings["pdf_workers"], progress_callback=update_text_progress
+        )
+        for i, resume_text in zip(to_parse, parsed_texts):
+            resume_texts[i] = resume_text
+
+        # Near duplicates: the same person under a different file, matched on normalized email or phone
+        def contact_keys(fields):
+            return [key for key in (("email", normalize_email(fields["email"])), ("phone", normalize_phone(fields["phone"]))) if key[1]]
+
+        first_by_contact = {}
+        for i in unique:
+            if i not in to_parse and existing_ids[i] is None and resume_texts[i]:
+                for key in contact_keys(resume_agent.pre_extract(resume_texts[i])):
+                    first_by_contact.setdefault(key, i)
+
+        with_text = [i for i in to_parse if resume_texts[i]]
+        contact_fields = [resume_agent.pre_extract(resume_texts[i]) for i in with_text]
+        contact_matches = db.find_candidates_by_contact([(fields["email"], fields["phone"]) for fields in contact_fields])
+
+        for i, fields, match in zip(with_text, contact_fields, contact_matches):
+            if match:
+                existing_ids[i] = match["id"]
+                extraction_results[i] = match["extracted_data"]
+                notes[i] = "Reused stored candidate with the same email or phone"
+                continue
+
+            keys = contact_keys(fields)
+            duplicate_of = next((first_by_contact[key] for key in keys if key in first_by_contact), None)
+            if duplicate_of is not None:
+                on_item(i, "skipped", f"Same candidate as {names[duplicate_of]}")
+                unique.remove(i)
+                continue
+            for key in keys:
+                first_by_contact[key] = i
+
+        # Edited resubmissions: resumes whose text is nearly identical to a stored candidate's (MinHash/LSH)
+        near_matches = {}
+        for i in with_text:
+            if existing_ids[i] is None and i in unique:
+                match = resume_agent.find_near_duplicate(resume_texts[i], threshold=self.settings["near_duplicate_threshold"])
+                if match:
+                    near_matches[i] = (int(match[0]), match[1])
+
+        # Ignore index entries whose candidate no longer exists
+        near_duplicate_data = db.get_extracted_data(candidate_id for candidate_id, _ in near_matches.values())
+        reused_by_text = 0
+        for i, (candidate_id, similarity) in near_matches.items():
+            if candidate_id not in near_duplicate_data:
+                continue
+            if self.settings["near_duplicate_mode"] == "Merge":
+                existing_ids[i] = candidate_id
+                extraction_results[i] = near_duplicate_data[candidate_id]
+                notes[i] = f"Merged into stored candidate {candidate_id} (Jaccard {similarity:.2f})"
+                reused_by_text += 1
+            else:
+                notes[i] = f"Looks like an edited version of stored candidate {candidate_id} (Jaccard {similarity:.2f})"
+
+        reused_by_contact = sum(1 for match in contact_matches if match)
+        for i in to_parse:
+            if i not in unique:
+                continue
+            if existing_ids[i] is not None:
+                checkpoint(i, "fields_extracted", content_hash=content_hashes[i], candidate_id=existing_ids[i], extracted_data=extraction_results[i])
+            elif resume_texts[i]:
+                # A PDF that failed to parse or timed out stays queued, so a resumed run parses it again
+                checkpoint(i, "text_extracted", content_hash=content_hashes[i], resume_text=resume_texts[i])
+
+        # Extract information from every new resume first so the pool can be scored in one pass,
+        # packing several resumes into each extraction prompt when batching is enabled
+        to_extract = [i for i in unique if extraction_results[i] is None]
+        batches = [
+            [to_extract[k] for k in batch]
+            for batch in resume_agent.plan_batches(
+                [resume_texts[i] for i in to_extract], max_batch_size=self.settings["extraction_batch_size"]
+            )
+        ]
+
+        def extract(batch):
+            try:
+                if len(batch) == 1:
+                    return [resume_agent.process_resume_file(resume_paths[batch[0]], resume_text=resume_texts[batch[0]])]
+                return resume_agent.process_resume_batch(
+                    [resume_paths[i] for i in batch], [resume_texts[i] for i in batch]
+                )
+            except Exception as e:
+                return [{"error": str(e)} for _ in batch]
+
+        completed = 0
+        for j, batch_results in run_concurrently(extract, batches, max_workers=max_in_flight):
+            for i, resume_data in zip(batches[j], batch_results):
+                extraction_results[i] = resume_data
+                if "error" in resume_data:
+                    on_item(i, "failed", resume_data["error"])
+                else:
+                    checkpoint(i, "fields_extracted", extracted_data=resume_data)
+
+            # Update progress as results arrive, in whatever order they complete
+            completed += len(batches[j])
+            on_progress(
+                f"Extracted {completed}/{len(to_extract)} resumes (latest: {names[batches[j][-1]]})",
+                completed / (2 * len(to_extract))
+            )
+
+        kept = [i for i in unique if "error" not in extraction_results[i]]
+        extracted = [extraction_results[i] for i in kept]
+
+        # Calculate similarity scores for the whole pool with a single TF-IDF fit (cheap, so any new item rescores all)
+        if any(i not in similarity_by_item for i in kept):
+            for i, score in zip(kept, self.similarity_calculator.score_batch(job_data, extracted)):
+                similarity_by_item[i] = float(score)
+                checkpoint(i, "similarity_scored", similarity_score=similarity_by_item[i])
+        similarity_scores = [similarity_by_item[i] for i in kept]
+
+        # Only proceed with recruiting evaluation if similarity score is high enough (and LLM calls are enabled)
+        to_evaluate = [
+            k for k, similarity_score in enumerate(similarity_scores)
+            if self.use_llm and similarity_score >= self.settings["similarity_threshold"] and kept[k] not in recruiting_by_item
+        ]
+
+        def evaluate(k):
+            return self.recruiting_agent.evaluate_candidate(job_data, extracted[k])
+
+        completed = 0
+        failed_evaluations = set()
+        for j, recruiting_score in run_concurrently(evaluate, to_evaluate, max_workers=max_in_flight):
+            i = kept[to_evaluate[j]]
+            if "error" in recruiting_score:
+                # The LLM call failed (e.g. quota exhausted): fail the item at its current stage so a resume retries it
+                on_item(i, "failed", recruiting_score["error"])
+                failed_evaluations.add(i)
+            else:
+                recruiting_by_item[i] = recruiting_score
+                checkpoint(i, "recruiting_evaluated", result={"recruiting_score": recruiting_score})
+
+            completed += 1
+            on_progress(
+                f"Evaluated {completed}/{len(to_evaluate)} candidates above the similarity threshold (latest: {names[i]})",
+                0.5 + completed / (2 * len(to_evaluate))
+            )
+        # Failed items are not stored, and keep their checkpoints for the retry
+        evaluated = [k for k, i in enumerate(kept) if i not in failed_evaluations]
+        kept = [kept[k] for k in evaluated]
+        extracted = [extracted[k] for k in evaluated]
+        similarity_scores = [similarity_scores[k] for k in evaluated]
+        recruiting_scores = [recruiting_by_item.get(i) for i in kept]
+
+        # Store the new candidates and all evaluations in two transactions; duplicates reuse their stored candidate
+        on_progress("Saving candidates", 1.0)
+        new = [i for i in kept if existing_ids[i] is None]
+        new_ids = db.add_candidates_bulk([
+            {
+                "cv_filename": names[i],
+                "name": extraction_results[i].get("name"),
+                "email": extraction_results[i].get("email"),
+                "phone": extraction_results[i].get("phone"),
+                "extracted_data": extraction_results[i],
+                "content_hash": content_hashes[i],
+                "resume_text": mask_pii(resume_texts[i] or "")
+            }
+            for i in new
+        ])
+        for i, candidate_id in zip(new, new_ids):
+            existing_ids[i] = candidate_id
+            resume_agent.index_resume(candidate_id, resume_texts[i])
+        self.similarity_calculator.index_resumes({existing_ids[i]: extraction_results[i] for i in new})
+        candidate_ids = [existing_ids[i] for i in kept]
+
+        eval_ids = db.add_evaluations_bulk([
+            {
+                "candidate_id": candidate_id,
+                "job_id": job_data.get("job_id"),
+                "similarity_score": similarity_score,
+                "recruiting_score": recruiting_score.get("overall_score") if recruiting_score else None,
+                "final_score": (similarity_score + recruiting_score.get("overall_score", 0)) / 2 if recruiting_score else None
+            }
+            for candidate_id, similarity_score, recruiting_score in zip(candidate_ids, similarity_scores, recruiting_scores)
+        ])
+
+        candidates = []
+        for i, resume_data, candidate_id, eval_id, similarity_score, recruiting_score in zip(
+            kept, extracted, candidate_ids, eval_ids, similarity_scores, recruiting_scores
+        ):
+            candidates.append({
+                "id": candidate_id,
+                "eval_id": eval_id,
+                "filename": names[i],
+                "data": resume_data,
+                "similarity_score": similarity_score,
+                "recruiting_score": recruiting_score
+            })
+            # The parsed text is only needed until the candidate is stored
+            checkpoint(
+                i, "done", status="done", message=notes.get(i), candidate_id=candidate_id, eval_id=eval_id, resume_text=None,
+                result={"similarity_score": similarity_score, "recruiting_score": recruiting_score}
+            )
+
+        return {
+            "candidates": candidates,
+            "resumed": resumed,
+            "reused_by_hash": reused_by_hash,
+            "reused_by_contact": reused_by_contact,
+            "reused_by_text": reused_by_text,
+            "rate_limited": self.rate_limiter.rate_limited_count
+        }
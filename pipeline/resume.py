@@ -0,0 +1,49 @@
+"""Resume a checkpointed resume processing run in the foreground.
+
+Requeues a failed or interrupted run (or a completed one whose resumes partly
+failed, e.g. when the LLM quota ran out) and processes it in this process.
+Every resume skips the stages it already passed (text extracted, fields
+extracted, similarity scored, recruiting evaluated), so only the missing work
+and LLM calls are repeated. The run ID is the processing job ID shown on the
+Process CVs page.
+
+Usage:
+    python -m pipeline.resume RUN_ID [--db sqlite:///recruitment.db] [--stale-after 120]
+"""
+import argparse
+import os
+import socket
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db import Database
+from pipeline.worker import WorkerPool
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("run_id", type=int)
+    parser.add_argument("--db", default=None, help="Database URL (defaults to DATABASE_URL, then sqlite:///recruitment.db)")
+    parser.add_argument("--stale-after", type=float, default=120.0,
+                        help="Seconds without a heartbeat after which a running job counts as interrupted")
+    args = parser.parse_args()
+
+    pool = WorkerPool(Database(args.db), num_workers=0, stale_after=args.stale_after)
+    if not pool.resume(args.run_id, api_key=os.getenv("CHATGROQ_API_KEY")):
+        print(f"Run {args.run_id} cannot be resumed: it does not exist, is queued or running, or has nothing left to retry")
+        sys.exit(1)
+
+    job = pool.queue.claim(f"{socket.gethostname()}:{os.getpid()}:resume", processing_job_id=args.run_id)
+    if job is None:
+        print(f"Run {args.run_id} was claimed by another worker")
+        sys.exit(1)
+    pool.run_job(job)
+
+    status = pool.queue.get_job(args.run_id)
+    counts = ", ".join(f"{count} {item_status}" for item_status, count in sorted(status["item_counts"].items()))
+    print(f"Run {args.run_id} {status['status']}: {status['stage']} ({counts})")
+    if status["error"]:
+        print(f"Error: {status['error']}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
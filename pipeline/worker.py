@@ -0,0 +1,195 @@
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from database.jobs import JobQueue
+from utils.cache import ExtractionCache
+from utils.inverted_index import InvertedIndex
+from utils.minhash import MinHashLSHIndex
+from utils.rate_limit import RateLimiter
+from .processor import BatchProcessor
+
+class WorkerPool:
+    """Background threads that run queued processing jobs, independent of any Streamlit session
+
+    Each worker runs one job at a time and records per-resume outcomes and progress in the job tables,
+    so results survive reruns and restarts and any session can poll them.
+    """
+
+    def __init__(self, db, num_workers: int = 2, poll_interval: float = 2.0, stale_after: float = 120.0,
+                 extraction_cache: Optional[ExtractionCache] = None, near_duplicate_index: Optional[MinHashLSHIndex] = None,
+                 term_index: Optional[InvertedIndex] = None, heartbeat_interval: Optional[float] = None):
+        """Create the pool; call start() to launch the worker threads
+
+        Running jobs send a heartbeat every heartbeat_interval seconds (default stale_after / 4), whatever
+        stage they are in, so only jobs of dead workers go stale.
+        """
+        self.db = db
+        self.queue = JobQueue(db)
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval or stale_after / 4
+        self.extraction_cache = extraction_cache or ExtractionCache()
+        self.near_duplicate_index = near_duplicate_index or MinHashLSHIndex()
+        self.term_index = term_index or InvertedIndex()
+
+        # API keys are kept in memory only; jobs recovered after a restart fall back to CHATGROQ_API_KEY
+        self._api_keys: Dict[int, str] = {}
+        # Jobs with the same limits share one request/token budget
+        self._rate_limiters: Dict[tuple, RateLimiter] = {}
+        # Workers of this pool currently running a job; their jobs are never requeued as stale
+        self._busy_workers: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "WorkerPool":
+        """Requeue jobs abandoned by dead workers and launch the worker threads"""
+        self.queue.requeue_stale(self.stale_after, live_workers=self._live_workers())
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for n in range(self.num_workers):
+            thread = threading.Thread(target=self._run, args=(f"{prefix}:{n}",), name=f"resume-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers once their current jobs finish"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def submit(self, job_data: Dict[str, Any], paths: List[str], settings: Optional[Dict[str, Any]] = None,
+               api_key: Optional[str] = None) -> int:
+        """Queue a batch and wake an idle worker, returning the processing job ID immediately"""
+        processing_job_id = self.queue.enqueue(job_data, paths, settings)
+        if api_key:
+            with self._lock:
+                self._api_keys[processing_job_id] = api_key
+        self._wake.set()
+        return processing_job_id
+
+    def resume(self, processing_job_id: int, api_key: Optional[str] = None) -> bool:
+        """Requeue a failed or interrupted run from its checkpoints and wake a worker; False if it cannot be resumed"""
+        if not self.queue.resume(processing_job_id, self.stale_after):
+            return False
+        if api_key:
+            with self._lock:
+                self._api_keys[processing_job_id] = api_key
+        self._wake.set()
+        return True
+
+    def _rate_limiter(self, settings: Dict[str, Any]) -> RateLimiter:
+        key = (settings.get("requests_per_minute", 30), settings.get("tokens_per_minute", 30000))
+        with self._lock:
+            if key not in self._rate_limiters:
+                self._rate_limiters[key] = RateLimiter(requests_per_minute=key[0], tokens_per_minute=key[1])
+            return self._rate_limiters[key]
+
+    def _live_workers(self) -> List[str]:
+        with self._lock:
+            return list(self._busy_workers)
+
+    def _heartbeat(self, processing_job_id: int, worker: str, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_interval):
+            try:
+                if not self.queue.heartbeat(processing_job_id, worker):
+                    print(f"Processing job {processing_job_id} is no longer running on {worker}")
+                    return
+            except Exception:
+                traceback.print_exc()
+
+    def _run(self, worker: str) -> None:
+        last_stale_check = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_stale_check > self.stale_after:
+                    self.queue.requeue_stale(self.stale_after, live_workers=self._live_workers())
+                    last_stale_check = time.monotonic()
+
+                job = self.queue.claim(worker)
+            except Exception:
+                traceback.print_exc()
+                job = None
+
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+
+            self.run_job(job)
+
+    def run_job(self, job: Dict[str, Any], progress_callback: Optional[Callable[[str, float], None]] = None) -> None:
+        """Process a claimed job, recording item outcomes and progress as they happen (also passed to progress_callback)"""
+        processing_job_id = job["id"]
+        worker = job["worker"]
+        with self._lock:
+            api_key = self._api_keys.pop(processing_job_id, None)
+            self._busy_workers.add(worker)
+        last_report = [0.0]
+
+        # Progress is not reported while waiting on the rate limiter, a long LLM call or PDF parsing
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(processing_job_id, worker, stop_heartbeat),
+            name=f"heartbeat-{processing_job_id}", daemon=True
+        )
+        heartbeat.start()
+
+        def on_item(position, status, message=None):
+            self.queue.record_items(processing_job_id, [{"position": position, "status": status, "message": message}])
+
+        def on_checkpoint(position, stage, **fields):
+            self.queue.record_items(processing_job_id, [dict(fields, position=position, stage=stage)])
+
+        def on_progress(stage, fraction):
+            # Throttled, as PDF parsing reports every file
+            now = time.monotonic()
+            if now - last_report[0] >= 0.5 or fraction >= 1.0:
+                last_report[0] = now
+                self.queue.report_progress(processing_job_id, stage, fraction)
+                if progress_callback:
+                    progress_callback(stage, fraction)
+
+        try:
+            self._process(job, api_key, on_item, on_progress, on_checkpoint)
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+            with self._lock:
+                self._busy_workers.discard(worker)
+
+    def _process(self, job: Dict[str, Any], api_key: Optional[str], on_item: Callable, on_progress: Callable,
+                 on_checkpoint: Callable) -> None:
+        processing_job_id = job["id"]
+        try:
+            processor = BatchProcessor(
+                self.db, job["settings"], api_key=api_key, extraction_cache=self.extraction_cache,
+                near_duplicate_index=self.near_duplicate_index, term_index=self.term_index,
+                rate_limiter=self._rate_limiter(job["settings"])
+            )
+            summary = processor.process(
+                job["job_data"], job["paths"], on_item=on_item, on_progress=on_progress,
+                checkpoints=self.queue.get_checkpoints(processing_job_id), on_checkpoint=on_checkpoint
+            )
+        except Exception as e:
+            traceback.print_exc()
+            self.queue.finish(processing_job_id, "Failed; resume the run to continue from its checkpoints", error=str(e))
+            return
+
+        stage = f"Processed {len(summary['candidates'])} resumes"
+        if summary["resumed"]:
+            stage += f" ({summary['resumed']} resumed from checkpoints)"
+        reused = summary["reused_by_hash"] + summary["reused_by_contact"] + summary["reused_by_text"]
+        if reused:
+            stage += (
+                f"; reused {summary['reused_by_hash']} identical files, {summary['reused_by_contact']} email or phone "
+                f"matches and {summary['reused_by_text']} near-duplicate resumes"
+            )
+        self.queue.finish(processing_job_id, stage)
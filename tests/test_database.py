@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db import Database
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(f"sqlite:///{tmp_path / 'recruitment.db'}")
+
+def test_bulk_upsert_with_duplicate_content_hashes(db):
+    ids = db.add_candidates_bulk([
+        {"cv_filename": "a.pdf", "name": "First Upload", "content_hash": "same", "resume_text": "python developer"},
+        {"cv_filename": "a_copy.pdf", "name": "Second Upload", "content_hash": "same", "extracted_data": {"skills": ["sql"]}},
+        {"cv_filename": "b.pdf", "name": "Other", "content_hash": "other", "resume_text": "java developer"}
+    ])
+
+    assert ids[0] == ids[1] != ids[2]
+    assert db.get_candidate(ids[0]).name == "Second Upload"
+
+    # One search entry per candidate: the last document, keeping the earlier resume text
+    assert [row["id"] for row in db.search_candidates("python")] == [ids[0]]
+    assert [row["id"] for row in db.search_candidates("sql")] == [ids[0]]
+    assert [row["id"] for row in db.search_candidates("java")] == [ids[2]]
+
+def test_upsert_keeps_stored_values_for_missing_fields(db):
+    candidate_id = db.add_candidate("a.pdf", name="Ada", email="ada@example.com", extracted_data={"skills": ["python"]}, content_hash="h")
+    assert db.add_candidate("a_renamed.pdf", content_hash="h") == candidate_id
+
+    candidate = db.get_candidate(candidate_id)
+    assert (candidate.cv_filename, candidate.name, candidate.email) == ("a_renamed.pdf", "Ada", "ada@example.com")
+    assert db.get_extracted_data([candidate_id])[candidate_id] == {"skills": ["python"]}
+    assert [candidate.id for candidate in db.get_candidates_with_skills(["python"])] == [candidate_id]
+    assert [row["id"] for row in db.search_candidates("ada")] == [candidate_id]
+
+def test_re_scoring_an_evaluation_replaces_its_scores(db):
+    job_id = db.add_job_description("Engineer", "Build things")
+    candidate_id = db.add_candidate("a.pdf", content_hash="h")
+    eval_id = db.add_evaluations_bulk([{"candidate_id": candidate_id, "job_id": job_id, "similarity_score": 9.0, "recruiting_score": 8.0, "final_score": 8.5}])[0]
+    db.update_evaluation(eval_id, shortlisted=True)
+
+    # No recruiting evaluation this time (e.g. below the similarity threshold): the old scores must not survive
+    assert db.add_evaluation(candidate_id, job_id, similarity_score=0.1) == eval_id
+    evaluation = db.get_evaluation(eval_id)
+    assert (evaluation.similarity_score, evaluation.recruiting_score, evaluation.final_score) == (0.1, None, None)
+    assert evaluation.shortlisted
@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.llm_backends import RecordingLLM, ReplayLLM, SyntheticLLM
+from utils.llm_gateway import LLMGateway
+
+def test_record_mode_records_prompts_already_in_the_live_cache(tmp_path):
+    gateway = LLMGateway(cache_path=str(tmp_path / "llm_cache.db"))
+    live = SyntheticLLM()
+    prompt = "You are an expert recruiter evaluating candidates"
+    response = gateway.invoke(live, prompt, "recruiting", "model", 0.2, backend="live")
+
+    # The live response is cached, but recording still sends the prompt upstream so a replay can serve it
+    recording_path = str(tmp_path / "llm_recording.jsonl")
+    assert gateway.invoke(RecordingLLM(live, recording_path), prompt, "recruiting", "model", 0.2, backend="record") == response
+    assert ReplayLLM(recording_path, latency=0.0).invoke(prompt) == response
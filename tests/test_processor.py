@@ -0,0 +1,89 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database.db import Database
+from pipeline.worker import WorkerPool
+from utils import llm_gateway
+from utils.cache import ExtractionCache
+from utils.inverted_index import InvertedIndex
+from utils.llm_backends import SyntheticLLM
+from utils.minhash import MinHashLSHIndex
+
+CVS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Dataset", "CVs1")
+
+JOB_DATA = {
+    "job_title": "Software Engineer",
+    "summary": "Python developer with SQL experience",
+    "key_requirements": ["python", "sql"],
+    "evaluation_questions": ["Does the candidate know Python?"]
+}
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    # Synthetic LLM responses, and a fresh gateway so no response cached by another test is served
+    monkeypatch.setenv("LLM_BACKEND", "synthetic")
+    monkeypatch.setenv("LLM_RESPONSE_CACHE", "off")
+    monkeypatch.setattr(llm_gateway, "_default_gateway", None)
+    return WorkerPool(
+        Database(f"sqlite:///{tmp_path / 'recruitment.db'}"), num_workers=0,
+        extraction_cache=ExtractionCache(str(tmp_path / "cache.db")),
+        near_duplicate_index=MinHashLSHIndex(str(tmp_path / "minhash.db")),
+        term_index=InvertedIndex(str(tmp_path / "terms.db"))
+    )
+
+def sample_cvs(tmp_path, count):
+    names = sorted(name for name in os.listdir(CVS_DIR) if name.lower().endswith(".pdf"))[:count]
+    paths = []
+    for name in names:
+        paths.append(str(tmp_path / name))
+        shutil.copy(os.path.join(CVS_DIR, name), paths[-1])
+    return paths
+
+def run(pool, run_id):
+    pool.run_job(pool.queue.claim("test-worker", processing_job_id=run_id))
+    return {item["position"]: item for item in pool.queue.get_items(run_id)}
+
+def test_resume_parses_a_pdf_that_failed_to_parse(pool, tmp_path):
+    paths = sample_cvs(tmp_path, 2)
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"not a pdf")
+    run_id = pool.submit(JOB_DATA, paths[:1] + [str(bad)], {"fast_triage": True})
+
+    items = run(pool, run_id)
+    assert (items[1]["status"], items[1]["stage"]) == ("failed", "queued")
+
+    # Replace the broken file with a valid CV; the resumed run parses it again
+    shutil.copy(paths[1], bad)
+    assert pool.resume(run_id)
+    items = run(pool, run_id)
+    assert [(item["status"], item["stage"]) for item in items.values()] == [("done", "done"), ("done", "done")]
+
+def test_failed_llm_evaluation_fails_the_item_for_a_resume(pool, tmp_path, monkeypatch):
+    paths = sample_cvs(tmp_path, 2)
+    run_id = pool.submit(JOB_DATA, paths, {"similarity_threshold": 0.0})
+
+    synthetic_invoke = SyntheticLLM.invoke
+
+    # Rate limit errors are retried with backoff first, so fail with an error that surfaces at once
+    def upstream_unavailable(self, prompt):
+        if "expert recruiter" in prompt:
+            raise RuntimeError("503 Service Unavailable")
+        return synthetic_invoke(self, prompt)
+
+    monkeypatch.setattr(SyntheticLLM, "invoke", upstream_unavailable)
+    items = run(pool, run_id)
+    assert [(item["status"], item["stage"]) for item in items.values()] == [("failed", "similarity_scored")] * 2
+    assert "503" in items[0]["message"]
+
+    # Only the evaluation is retried, and the stored scores come from the successful one
+    monkeypatch.setattr(SyntheticLLM, "invoke", synthetic_invoke)
+    assert pool.resume(run_id)
+    items = run(pool, run_id)
+    assert [(item["status"], item["stage"]) for item in items.values()] == [("done", "done")] * 2
+    for item in items.values():
+        assert "error" not in item["result"]["recruiting_score"]
+        assert pool.db.get_evaluation(item["eval_id"]).recruiting_score is not None
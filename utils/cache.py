@@ -0,0 +1,137 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Cache database lives next to recruitment.db
+EXTRACTION_CACHE_PATH = "extraction_cache.db"
+
+class SQLiteLRUCache:
+    """Size-bounded LRU key/value store persisted in a SQLite table"""
+
+    def __init__(self, db_path: str, table: str = "cache", max_bytes: int = 256 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        """Initialize the cache table and hit/miss counters"""
+        self.db_path = db_path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.table}_accessed_at ON {self.table} (accessed_at)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection so the cache is safe to share across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                row = None
+
+            if row is None:
+                with self._lock:
+                    self.misses += 1
+                return None
+
+            # Touch the entry so it is evicted last
+            conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serialisable value and evict least recently used entries if over budget"""
+        data = json.dumps(value)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete least recently used entries until the table fits in max_bytes"""
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        to_delete = []
+        for key, size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at"):
+            to_delete.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+        conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", to_delete)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters"""
+        with self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current size of the cache"""
+        with self._connect() as conn:
+            entries, size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+class ExtractionCache:
+    """Persistent cache of PDF text and structured resume extractions keyed by file content"""
+
+    def __init__(self, db_path: str = EXTRACTION_CACHE_PATH, max_bytes: int = 256 * 1024 * 1024):
+        """Initialize the text and extraction caches in the same SQLite file"""
+        self.texts = SQLiteLRUCache(db_path, table="pdf_text_cache", max_bytes=max_bytes)
+        self.extractions = SQLiteLRUCache(db_path, table="resume_extraction_cache", max_bytes=max_bytes)
+
+    def get_text(self, file_hash: str) -> Optional[str]:
+        """Get the cached text of a PDF by its SHA-256"""
+        return self.texts.get(file_hash)
+
+    def set_text(self, file_hash: str, text: str) -> None:
+        """Cache the text of a PDF by its SHA-256"""
+        self.texts.set(file_hash, text)
+
+    def get_extraction(self, file_hash: str, model_name: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        """Get the cached structured extraction for a PDF, model and prompt version"""
+        return self.extractions.get(self._extraction_key(file_hash, model_name, prompt_version))
+
+    def set_extraction(self, file_hash: str, model_name: str, prompt_version: str, data: Dict[str, Any]) -> None:
+        """Cache the structured extraction for a PDF, model and prompt version"""
+        self.extractions.set(self._extraction_key(file_hash, model_name, prompt_version), data)
+
+    def _extraction_key(self, file_hash: str, model_name: str, prompt_version: str) -> str:
+        return f"{file_hash}:{model_name}:{prompt_version}"
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get hit/miss counters for both caches"""
+        return {"text": self.texts.stats(), "extraction": self.extractions.stats()}
@@ -1,6 +1,6 @@
 import os
+import hashlib
 import re
-import pandas as pd
 from datetime import datetime, timedelta
 import random
 
@@ -73,19 +73,42 @@ Recruitment Team
 """
     return {"subject": subject, "body": body}
 
-def mask_pii(text):
-    """Mask personally identifiable information in text"""
-    # Mask email addresses
-    text = re.sub(r'[\w\.-]+@[\w\.-]+', '[EMAIL REDACTED]', text)
+# All PII kinds in one compiled alternation, so masking is a single left-to-right pass.
+# Emails are only tried at the start of a word, phones and addresses only where a digit, "(" or "+"
+# follows, and street names are limited to a few words so no branch backtracks over long stretches of text.
+PII_PATTERN = re.compile(
+    r'(?<![\w\.-])(?P<EMAIL>[\w\.-]+@[\w\.-]+)'
+    r'|(?=[\d(+])\b(?:'
+    r'(?P<PHONE>(?:\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b)'
+    r'|(?P<ADDRESS>\d+\s+(?:[A-Za-z]+,?\s+){1,6}?(?:Avenue|Lane|Road|Boulevard|Drive|Street|Ave|Dr|Rd|Blvd|Ln|St)\.?\b)'
+    r')'
+)
+
+PII_REPLACEMENTS = {
+    "EMAIL": "[EMAIL REDACTED]",
+    "PHONE": "[PHONE REDACTED]",
+    "ADDRESS": "[ADDRESS REDACTED]"
+}
+
+def mask_pii_with_spans(text):
+    """Mask personally identifiable information in one pass, returning the masked text and (start, end, kind) spans of the original text"""
+    parts = []
+    spans = []
+    last = 0
     
-    # Mask phone numbers (various formats)
-    text = re.sub(r'\b(?:\+\d{1,2}\s)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b', '[PHONE REDACTED]', text)
+    for match in PII_PATTERN.finditer(text):
+        kind = match.lastgroup
+        parts.append(text[last:match.start()])
+        parts.append(PII_REPLACEMENTS[kind])
+        spans.append((match.start(), match.end(), kind))
+        last = match.end()
     
-    # Mask addresses (simplified)
-    text = re.sub(r'\b\d+\s+[A-Za-z\s,]+(?:Avenue|Lane|Road|Boulevard|Drive|Street|Ave|Dr|Rd|Blvd|Ln|St)\.?\b', 
-                 '[ADDRESS REDACTED]', text)
-    
-    return text
+    parts.append(text[last:])
+    return "".join(parts), spans
+
+def mask_pii(text):
+    """Mask personally identifiable information in text"""
+    return mask_pii_with_spans(text)[0]
 
 def calculate_similarity_threshold(job_title):
     """Calculate similarity threshold based on job title/category"""
@@ -101,3 +124,24 @@ def calculate_similarity_threshold(job_title):
         threshold = 8.5  # Management roles might need higher precision
     
     return threshold
+
+def compute_file_hash(file_path, chunk_size=1 << 20):
+    """Compute the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def normalize_email(email):
+    """Normalize an email address for duplicate detection (trimmed and lowercased), or None if it is not one"""
+    if not email or "@" not in email:
+        return None
+    return email.strip().lower()
+
+def normalize_phone(phone, digits=10):
+    """Normalize a phone number to its last `digits` digits for duplicate detection, or None if it is too short"""
+    if not phone:
+        return None
+    phone_digits = re.sub(r"\D", "", phone)
+    return phone_digits[-digits:] if len(phone_digits) >= digits else None
@@ -0,0 +1,332 @@
+import json
+import math
+import os
+import sqlite3
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Term index database lives next to recruitment.db
+TERM_INDEX_PATH = "term_index.db"
+
+# Each call opens its own connection; memory-mapping keeps segment pages warm across connections
+TERM_INDEX_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "mmap_size": 268435456
+}
+
+def idf(df: int, num_docs: int) -> float:
+    """Smoothed inverse document frequency, as computed by scikit-learn's TfidfTransformer"""
+    return math.log((1 + num_docs) / (1 + df)) + 1
+
+def default_analyzer() -> Callable[[str], List[str]]:
+    """Tokenizer matching SimilarityScoreCalculator's TF-IDF vectorizer (lowercase words, English stop words removed)"""
+    return TfidfVectorizer(stop_words='english').build_analyzer()
+
+# Terms with more segments than this have their newest segments merged while an older segment is at most
+# MERGE_FACTOR times the newer ones combined, so sizes shrink geometrically and each posting is rewritten O(log n) times
+MAX_SEGMENTS = 8
+MERGE_FACTOR = 2
+
+class InvertedIndex:
+    """Persistent term -> posting list index with top-k retrieval using a MaxScore cutoff
+
+    Postings store each document's term frequencies divided by the norm of its TF-IDF vector, and the
+    current global IDF is applied at query time, so scores approximate the TF-IDF cosine of score_batch
+    without reweighting existing postings as the collection grows. Document norms use the IDF as of
+    indexing; re-adding a changed document refreshes its norm.
+
+    Each batch of documents appends a small segment per term instead of rewriting the term's whole
+    posting list, and a term's segments are merged in size tiers once it has more than MAX_SEGMENTS,
+    so adding a batch costs about its own size rather than the size of the collection.
+    """
+
+    def __init__(self, db_path: str = TERM_INDEX_PATH, analyzer: Optional[Callable[[str], List[str]]] = None):
+        """Initialize the index tables"""
+        self.db_path = db_path
+        self.analyzer = analyzer or default_analyzer()
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS terms ("
+                "term TEXT PRIMARY KEY, df INTEGER NOT NULL, segments INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            # Segments are parallel arrays of ascending document IDs (int64) and weights (float32);
+            # a document appears in at most one segment of a term
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS segments ("
+                "term TEXT NOT NULL, segment INTEGER NOT NULL, size INTEGER NOT NULL, max_weight REAL NOT NULL, "
+                "doc_ids BLOB NOT NULL, weights BLOB NOT NULL, PRIMARY KEY (term, segment))"
+            )
+            # Term counts of each indexed document, to skip unchanged and remove replaced documents
+            conn.execute("CREATE TABLE IF NOT EXISTS documents (doc_id INTEGER PRIMARY KEY, terms TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS index_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+            # Indexes built with one posting list per term become single-segment terms
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'postings'").fetchone():
+                conn.execute(
+                    "INSERT OR IGNORE INTO segments (term, segment, size, max_weight, doc_ids, weights) "
+                    "SELECT term, 0, df, max_weight, doc_ids, weights FROM postings"
+                )
+                conn.execute("INSERT OR IGNORE INTO terms (term, df, segments) SELECT term, df, 1 FROM postings")
+                conn.execute("DROP TABLE postings")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection so the index is safe to share across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        for name, value in TERM_INDEX_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _select(self, conn: sqlite3.Connection, query: str, terms: List[str], *params) -> Iterator[tuple]:
+        """Run a query with a "{terms}" placeholder list over the given terms in chunks"""
+        for start in range(0, len(terms), 500):
+            chunk = terms[start:start + 500]
+            yield from conn.execute(query.format(terms=", ".join("?" * len(chunk))), [*chunk, *params]).fetchall()
+
+    def _document_frequencies(self, conn: sqlite3.Connection, terms: List[str]) -> Dict[str, int]:
+        return dict(self._select(conn, "SELECT term, df FROM terms WHERE term IN ({terms})", terms))
+
+    def _load_postings(self, conn: sqlite3.Connection, terms: List[str]) -> Dict[str, Tuple[float, np.ndarray, np.ndarray]]:
+        """Load (max_weight, doc_ids, weights) for the given terms, combining their segments"""
+        segments: Dict[str, list] = {}
+        for term, max_weight, doc_ids, weights in self._select(
+            conn, "SELECT term, max_weight, doc_ids, weights FROM segments WHERE term IN ({terms})", terms
+        ):
+            segments.setdefault(term, []).append(
+                (max_weight, np.frombuffer(doc_ids, dtype=np.int64), np.frombuffer(weights, dtype=np.float32))
+            )
+
+        postings = {}
+        for term, parts in segments.items():
+            if len(parts) == 1:
+                postings[term] = parts[0]
+                continue
+            ids = np.concatenate([part[1] for part in parts])
+            weights = np.concatenate([part[2] for part in parts])
+            if np.any(ids[1:] < ids[:-1]):
+                order = np.argsort(ids, kind="stable")
+                ids, weights = ids[order], weights[order]
+            postings[term] = (max(part[0] for part in parts), ids, weights)
+        return postings
+
+    def _segment_row(self, term: str, segment: int, ids: np.ndarray, weights: np.ndarray) -> tuple:
+        return (term, segment, int(ids.size), float(weights.max()), ids.tobytes(), weights.tobytes())
+
+    def _remove_documents(self, conn: sqlite3.Connection, terms: List[str], doc_ids: np.ndarray) -> None:
+        """Drop documents from the segments of the given terms, rewriting only segments that contain them"""
+        updates, deletes, removed = [], [], {}
+        for term, segment, ids, weights in self._select(
+            conn, "SELECT term, segment, doc_ids, weights FROM segments WHERE term IN ({terms})", terms
+        ):
+            ids = np.frombuffer(ids, dtype=np.int64)
+            keep = ~np.isin(ids, doc_ids)
+            if keep.all():
+                continue
+            df, emptied = removed.get(term, (0, 0))
+            if keep.any():
+                updates.append(self._segment_row(term, segment, ids[keep], np.frombuffer(weights, dtype=np.float32)[keep]))
+                removed[term] = (df + int(ids.size - keep.sum()), emptied)
+            else:
+                deletes.append((term, segment))
+                removed[term] = (df + int(ids.size), emptied + 1)
+
+        conn.executemany("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?)", updates)
+        conn.executemany("DELETE FROM segments WHERE term = ? AND segment = ?", deletes)
+        conn.executemany(
+            "UPDATE terms SET df = df - ?, segments = segments - ? WHERE term = ?",
+            [(df, emptied, term) for term, (df, emptied) in removed.items()]
+        )
+        conn.executemany("DELETE FROM terms WHERE term = ? AND df <= 0", [(term,) for term in removed])
+
+    def _merge_segments(self, conn: sqlite3.Connection, terms: List[str]) -> None:
+        """Merge the newest segments of terms that have more than MAX_SEGMENTS"""
+        crowded = [term for (term,) in self._select(
+            conn, "SELECT term FROM terms WHERE term IN ({terms}) AND segments > ?", terms, MAX_SEGMENTS
+        )]
+        sizes: Dict[str, List[Tuple[int, int]]] = {}
+        for term, segment, size in self._select(
+            conn, "SELECT term, segment, size FROM segments WHERE term IN ({terms}) ORDER BY term, segment", crowded
+        ):
+            sizes.setdefault(term, []).append((segment, size))
+
+        merged_rows, deletes, counts = [], [], []
+        for term, segments in sizes.items():
+            # Always merge the two newest, then older segments while they are not much larger than the merged ones
+            first = len(segments) - 2
+            newer = segments[-1][1] + segments[-2][1]
+            while first > 0 and segments[first - 1][1] <= MERGE_FACTOR * newer:
+                first -= 1
+                newer += segments[first][1]
+
+            rows = conn.execute(
+                "SELECT segment, doc_ids, weights FROM segments WHERE term = ? AND segment >= ?", (term, segments[first][0])
+            ).fetchall()
+            ids = np.concatenate([np.frombuffer(row[1], dtype=np.int64) for row in rows])
+            weights = np.concatenate([np.frombuffer(row[2], dtype=np.float32) for row in rows])
+            order = np.argsort(ids, kind="stable")
+            # The merged segment keeps the newest segment's number
+            deletes.extend((term, row[0]) for row in rows if row[0] != segments[-1][0])
+            merged_rows.append(self._segment_row(term, segments[-1][0], ids[order], weights[order]))
+            counts.append((len(rows) - 1, term))
+
+        conn.executemany("DELETE FROM segments WHERE term = ? AND segment = ?", deletes)
+        conn.executemany("INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?)", merged_rows)
+        conn.executemany("UPDATE terms SET segments = segments - ? WHERE term = ?", counts)
+
+    def add_documents(self, documents: Dict[int, str]) -> None:
+        """Add or replace documents, given as a dict of document ID (e.g. candidate ID) -> text"""
+        if not documents:
+            return
+
+        counts_by_doc = {doc_id: dict(Counter(self.analyzer(text or ""))) for doc_id, text in documents.items()}
+        with self._connect() as conn:
+            # Take the write lock first so concurrent writers cannot lose updates
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Documents indexed with the same term counts are unchanged; changed ones are removed and re-added
+            previous = {}
+            doc_ids = sorted(counts_by_doc)
+            for start in range(0, len(doc_ids), 500):
+                chunk = doc_ids[start:start + 500]
+                previous.update(conn.execute(
+                    f"SELECT doc_id, terms FROM documents WHERE doc_id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            replaced = {}
+            for doc_id, terms in previous.items():
+                terms = json.loads(terms)
+                if terms == counts_by_doc[doc_id]:
+                    del counts_by_doc[doc_id]
+                else:
+                    replaced[doc_id] = terms
+            if not counts_by_doc:
+                return
+            if replaced:
+                self._remove_documents(
+                    conn, sorted({term for terms in replaced.values() for term in terms}), np.array(sorted(replaced), dtype=np.int64)
+                )
+
+            new_postings: Dict[str, List[Tuple[int, int]]] = {}
+            for doc_id in sorted(counts_by_doc):
+                for term, count in counts_by_doc[doc_id].items():
+                    new_postings.setdefault(term, []).append((doc_id, count))
+            # Writing in key order keeps B-tree inserts local
+            new_postings = dict(sorted(new_postings.items()))
+            num_docs = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] + len(counts_by_doc) - len(replaced)
+
+            # Normalise the batch with the IDF it produces once added
+            df = self._document_frequencies(conn, list(new_postings))
+            for term, added in new_postings.items():
+                df[term] = df.get(term, 0) + len(added)
+            norms = {
+                doc_id: math.sqrt(sum((count * idf(df[term], num_docs)) ** 2 for term, count in counts.items())) or 1.0
+                for doc_id, counts in counts_by_doc.items()
+            }
+
+            # Append this batch as one new segment per term
+            row = conn.execute("SELECT value FROM index_meta WHERE key = 'next_segment'").fetchone()
+            segment = row[0] if row else 1
+            conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES ('next_segment', ?)", (segment + 1,))
+            conn.executemany("INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?)", [
+                self._segment_row(
+                    term, segment, np.array([doc_id for doc_id, _ in added], dtype=np.int64),
+                    np.array([count / norms[doc_id] for doc_id, count in added], dtype=np.float32)
+                )
+                for term, added in new_postings.items()
+            ])
+            conn.executemany(
+                "INSERT INTO terms (term, df, segments) VALUES (?, ?, 1) "
+                "ON CONFLICT (term) DO UPDATE SET df = df + excluded.df, segments = segments + 1",
+                [(term, len(added)) for term, added in new_postings.items()]
+            )
+            self._merge_segments(conn, list(new_postings))
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO documents (doc_id, terms) VALUES (?, ?)",
+                [(doc_id, json.dumps(counts, sort_keys=True)) for doc_id, counts in counts_by_doc.items()]
+            )
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def _query_weights(self, conn: sqlite3.Connection, text: str) -> Dict[str, float]:
+        """Weight of each query term against the stored document weights: its normalised TF-IDF times its IDF"""
+        counts = Counter(self.analyzer(text))
+        if not counts:
+            return {}
+
+        num_docs = conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        df = self._document_frequencies(conn, list(counts))
+
+        idfs = {term: idf(df.get(term, 0), num_docs) for term in counts}
+        norm = math.sqrt(sum((count * idfs[term]) ** 2 for term, count in counts.items()))
+        return {term: count * idfs[term] ** 2 / norm for term, count in counts.items()}
+
+    def retrieve_top_k(self, text: str, k: int = 50) -> List[Tuple[int, float]]:
+        """Return the k best (document ID, score) pairs for a query text, best first
+
+        Posting lists are processed term at a time in decreasing order of their maximum contribution,
+        accumulating into a dense score array. Once the k-th best partial score reaches the most an unseen
+        document could still collect from the remaining terms, no new documents are admitted (MaxScore):
+        the remaining, more common terms are only looked up for the surviving candidates, and candidates
+        that can no longer reach the k-th score are dropped.
+        """
+        with self._connect() as conn:
+            query = self._query_weights(conn, text)
+            postings = self._load_postings(conn, list(query))
+            max_doc_id = conn.execute("SELECT MAX(doc_id) FROM documents").fetchone()[0]
+        if not postings or k <= 0:
+            return []
+
+        terms = sorted(postings, key=lambda term: -query[term] * postings[term][0])
+        bounds = np.array([query[term] * postings[term][0] for term in terms])
+        remaining = np.concatenate([np.cumsum(bounds[::-1])[::-1], [0.0]])
+
+        def kth_score(scores: np.ndarray) -> float:
+            if scores.size < k:
+                return 0.0
+            return float(np.partition(scores, scores.size - k)[scores.size - k])
+
+        accumulator = np.zeros(max_doc_id + 1)
+        candidate_ids = None
+        for i, term in enumerate(terms):
+            _, ids, weights = postings[term]
+            contributions = query[term] * weights.astype(np.float64)
+
+            if candidate_ids is None:
+                accumulator[ids] += contributions
+                threshold = kth_score(accumulator)
+                if threshold > 0 and threshold >= remaining[i + 1]:
+                    candidate_ids = np.flatnonzero(accumulator)
+                    candidate_scores = accumulator[candidate_ids]
+                else:
+                    continue
+            else:
+                # Only existing candidates can still make the top k: look them up in this posting list
+                positions = np.minimum(np.searchsorted(ids, candidate_ids), ids.size - 1)
+                found = ids[positions] == candidate_ids
+                candidate_scores[found] += contributions[positions[found]]
+
+            keep = candidate_scores + remaining[i + 1] >= kth_score(candidate_scores)
+            candidate_ids, candidate_scores = candidate_ids[keep], candidate_scores[keep]
+
+        if candidate_ids is None:
+            candidate_ids = np.flatnonzero(accumulator)
+            candidate_scores = accumulator[candidate_ids]
+
+        top = np.argsort(-candidate_scores, kind="stable")[:k]
+        return [(int(candidate_ids[i]), float(candidate_scores[i])) for i in top]
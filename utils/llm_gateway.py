@@ -0,0 +1,161 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from utils.cache import SQLiteLRUCache
+from utils.llm_backends import backend_name, create_backend
+from utils.rate_limit import RateLimiter, RateLimitedLLM, estimate_tokens
+
+# Response cache database lives next to recruitment.db
+LLM_CACHE_PATH = "llm_cache.db"
+
+# Set to "off" to measure raw backend throughput without cached responses
+LLM_RESPONSE_CACHE_ENV = "LLM_RESPONSE_CACHE"
+
+# Cached responses are only served to the backend that produced them; recording calls the live API
+CACHE_NAMESPACES = {"record": "live"}
+
+# Backends that must see every prompt, so they only write the cache (a recording needs each exchange for replay)
+CACHE_WRITE_ONLY_BACKENDS = {"record"}
+
+def _token_usage(response: Any, prompt: str, text: str) -> Dict[str, int]:
+    """Read prompt/completion token counts from an LLM response, estimating them if the client does not report usage"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return {"prompt_tokens": usage.get("input_tokens", 0), "completion_tokens": usage.get("output_tokens", 0)}
+
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage")
+    if usage:
+        return {"prompt_tokens": usage.get("prompt_tokens", 0), "completion_tokens": usage.get("completion_tokens", 0)}
+
+    return {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text)}
+
+class LLMGateway:
+    """Single entry point for agent LLM calls with an on-disk response cache, request coalescing and usage counters"""
+
+    def __init__(self, cache: Optional[SQLiteLRUCache] = None, cache_path: str = LLM_CACHE_PATH,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600, max_bytes: int = 256 * 1024 * 1024,
+                 enable_cache: bool = True):
+        """Initialize the gateway and its response cache"""
+        self.cache = None
+        if enable_cache:
+            self.cache = cache if cache is not None else SQLiteLRUCache(
+                cache_path, table="llm_response_cache", max_bytes=max_bytes, ttl_seconds=ttl_seconds
+            )
+        self._inflight: Dict[str, Future] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def client(self, llm: Any, agent_name: str, model_name: str, temperature: float,
+               backend: str = "live") -> "GatewayClient":
+        """Bind an upstream LLM client to this gateway for one agent"""
+        return GatewayClient(self, llm, agent_name, model_name, temperature, backend=backend)
+
+    def _cache_key(self, backend: str, model_name: str, temperature: float, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return f"{CACHE_NAMESPACES.get(backend, backend)}:{model_name}:{temperature}:{prompt_hash}"
+
+    def _record(self, agent_name: str, **counters: float) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(agent_name, {
+                "calls": 0, "cache_hits": 0, "coalesced": 0, "upstream_calls": 0, "errors": 0,
+                "latency_seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0
+            })
+            for name, value in counters.items():
+                stats[name] += value
+
+    def invoke(self, llm: Any, prompt: str, agent_name: str, model_name: str, temperature: float,
+               limiter: Optional[RateLimiter] = None, backend: str = "live") -> str:
+        """Return the response text for a prompt, from cache, a concurrent identical call, or the upstream LLM
+
+        backend names the LLM_BACKEND that llm belongs to, so synthetic or replayed responses are never
+        served to live calls.
+        """
+        start = time.perf_counter()
+        key = self._cache_key(backend, model_name, temperature, prompt)
+
+        cached = self.cache.get(key) if self.cache and backend not in CACHE_WRITE_ONLY_BACKENDS else None
+        if cached is not None:
+            self._record(agent_name, calls=1, cache_hits=1, latency_seconds=time.perf_counter() - start)
+            return cached
+
+        # Merge identical prompts that are already in flight into one upstream call
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            try:
+                return future.result()
+            finally:
+                self._record(agent_name, calls=1, coalesced=1, latency_seconds=time.perf_counter() - start)
+
+        try:
+            upstream = RateLimitedLLM(llm, limiter) if limiter else llm
+            response = upstream.invoke(prompt)
+            text = getattr(response, "content", response)
+
+            if self.cache:
+                self.cache.set(key, text)
+            self._record(agent_name, calls=1, upstream_calls=1, latency_seconds=time.perf_counter() - start,
+                         **_token_usage(response, prompt, text))
+            future.set_result(text)
+            return text
+        except Exception as e:
+            self._record(agent_name, calls=1, upstream_calls=1, errors=1, latency_seconds=time.perf_counter() - start)
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-agent call, cache, latency and token counters"""
+        with self._lock:
+            stats = {agent_name: dict(counters) for agent_name, counters in self._stats.items()}
+        for counters in stats.values():
+            counters["avg_latency_seconds"] = counters["latency_seconds"] / counters["calls"] if counters["calls"] else 0.0
+        return stats
+
+class GatewayClient:
+    """LLM handle for one agent that routes invoke(prompt) through the shared gateway"""
+
+    def __init__(self, gateway: LLMGateway, llm: Any, agent_name: str, model_name: str, temperature: float,
+                 backend: str = "live"):
+        """Initialize the client; set limiter to apply a shared RateLimiter to upstream calls"""
+        self.gateway = gateway
+        self.llm = llm
+        self.agent_name = agent_name
+        self.model_name = model_name
+        self.temperature = temperature
+        self.backend = backend
+        self.limiter: Optional[RateLimiter] = None
+
+    def invoke(self, prompt: str) -> str:
+        """Invoke the LLM through the gateway and return the response text"""
+        return self.gateway.invoke(
+            self.llm, prompt, self.agent_name, self.model_name, self.temperature, limiter=self.limiter, backend=self.backend
+        )
+
+_default_gateway: Optional[LLMGateway] = None
+_default_gateway_lock = threading.Lock()
+
+def get_gateway() -> LLMGateway:
+    """Get the process-wide gateway shared by every agent"""
+    global _default_gateway
+    with _default_gateway_lock:
+        if _default_gateway is None:
+            _default_gateway = LLMGateway(enable_cache=os.getenv(LLM_RESPONSE_CACHE_ENV, "on").lower() != "off")
+        return _default_gateway
+
+def create_llm(agent_name: str, api_key: Optional[str], model_name: str, temperature: float,
+               gateway: Optional[LLMGateway] = None) -> GatewayClient:
+    """Create an agent's LLM client routed through the shared gateway"""
+    llm = create_backend(api_key, model_name, temperature)
+    return (gateway or get_gateway()).client(llm, agent_name, model_name, temperature, backend=backend_name())
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import re
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# LSH index database lives next to recruitment.db
+MINHASH_INDEX_PATH = "minhash_lsh.db"
+
+# Mersenne prime for the universal hash family h(x) = (a * x + b) mod p
+_MERSENNE_PRIME = (1 << 31) - 1
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+def shingles(text: str, size: int = 5) -> List[int]:
+    """Hash the overlapping word k-shingles of a text to 32-bit integers (case and whitespace insensitive)"""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return [zlib.crc32(" ".join(words).encode("utf-8"))] if words else []
+    return list({zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)})
+
+def lsh_parameters(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick (bands, rows) with bands * rows <= num_perm whose S-curve midpoint (1/b)^(1/r) is closest to the threshold"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class MinHasher:
+    """MinHash signatures of resume texts over word shingles"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        """Draw the num_perm hash functions"""
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the signature of a text: the minimum of each hash function over its shingles"""
+        values = np.array(shingles(text, self.shingle_size), dtype=np.int64) % _MERSENNE_PRIME
+        if values.size == 0:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.int64)
+        # (num_shingles, num_perm) in one vectorised pass; a * x stays below 2^62
+        return ((np.outer(values, self._a) + self._b) % _MERSENNE_PRIME).min(axis=0)
+
+    @staticmethod
+    def jaccard(signature: np.ndarray, other: np.ndarray) -> float:
+        """Estimate the Jaccard similarity of two texts from their signatures"""
+        return float(np.mean(signature == other))
+
+class MinHashLSHIndex:
+    """Banded LSH index of MinHash signatures persisted in SQLite, for sub-linear near-duplicate lookups"""
+
+    def __init__(self, db_path: str = MINHASH_INDEX_PATH, threshold: float = 0.8, num_perm: int = 128,
+                 shingle_size: int = 5):
+        """Initialize the index tables; signatures are only comparable for the same num_perm and shingle size"""
+        self.db_path = db_path
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.bands, self.rows = lsh_parameters(num_perm, threshold)
+
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS minhash_signatures (key TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS minhash_buckets ("
+                "band INTEGER NOT NULL, bucket BLOB NOT NULL, key TEXT NOT NULL, PRIMARY KEY (band, bucket, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_minhash_buckets_key ON minhash_buckets (key)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection so the index is safe to share across threads"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _buckets(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """Hash each band of a signature to a bucket ID"""
+        return [
+            (band, hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).digest())
+            for band in range(self.bands)
+        ]
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a resume text"""
+        return self.hasher.signature(text)
+
+    def insert(self, key: str, signature: np.ndarray) -> None:
+        """Add or replace the signature stored under a key (e.g. a candidate ID)"""
+        key = str(key)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM minhash_buckets WHERE key = ?", (key,))
+            conn.execute("INSERT OR REPLACE INTO minhash_signatures (key, signature) VALUES (?, ?)", (key, signature.tobytes()))
+            conn.executemany(
+                "INSERT OR IGNORE INTO minhash_buckets (band, bucket, key) VALUES (?, ?, ?)",
+                [(band, bucket, key) for band, bucket in self._buckets(signature)]
+            )
+
+    def remove(self, key: str) -> None:
+        """Remove the signature stored under a key"""
+        key = str(key)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM minhash_buckets WHERE key = ?", (key,))
+            conn.execute("DELETE FROM minhash_signatures WHERE key = ?", (key,))
+
+    def query(self, signature: np.ndarray, threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Return (key, estimated Jaccard) of indexed texts at or above the threshold, most similar first
+
+        Only keys sharing at least one band bucket are compared, so lookups touch a handful of rows
+        however large the index grows.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        buckets = self._buckets(signature)
+        with self._connect() as conn:
+            candidates = conn.execute(
+                "SELECT DISTINCT s.key, s.signature FROM minhash_buckets b JOIN minhash_signatures s ON s.key = b.key "
+                f"WHERE {' OR '.join(['(b.band = ? AND b.bucket = ?)'] * len(buckets))}",
+                [value for bucket in buckets for value in bucket]
+            ).fetchall()
+
+        matches = []
+        for key, blob in candidates:
+            similarity = MinHasher.jaccard(signature, np.frombuffer(blob, dtype=np.int64))
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: -match[1])
+
+    def query_text(self, text: str, threshold: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Find indexed texts similar to a text"""
+        return self.query(self.signature(text), threshold)
+
+    def insert_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Index (key, text) pairs"""
+        for key, text in items:
+            self.insert(key, self.signature(text))
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM minhash_signatures").fetchone()[0]
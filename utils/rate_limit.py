@@ -0,0 +1,126 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in a prompt (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception raised by an LLM client is an HTTP 429 / rate limit error"""
+    if getattr(error, "status_code", None) == 429:
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After header from a rate limit error, if the client exposes it"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """Initialize a full bucket"""
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, amount: float = 1.0) -> None:
+        """Block until the requested amount is available, then take it"""
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets with adaptive backoff on 429s"""
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: float = 30000,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        """Initialize the request and token buckets"""
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.penalty = 0.0
+        self.paused_until = 0.0
+        self.rate_limited_count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        """Wait for any backoff pause and for room in both budgets"""
+        while True:
+            with self._lock:
+                wait = self.paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+
+        self.requests.acquire(1)
+        self.tokens.acquire(tokens)
+
+    def record_success(self) -> None:
+        """Relax the backoff after a successful call"""
+        with self._lock:
+            self.penalty = self.penalty / 2 if self.penalty > self.base_delay else 0.0
+
+    def record_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """Pause every caller after a 429, doubling the pause while 429s keep coming"""
+        with self._lock:
+            self.rate_limited_count += 1
+            self.penalty = min(self.max_delay, max(self.base_delay, self.penalty * 2))
+            delay = max(self.penalty, retry_after or 0.0)
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+class RateLimitedLLM:
+    """Wrap an LLM client so every invoke respects a shared RateLimiter and retries on 429s"""
+
+    def __init__(self, llm: Any, limiter: RateLimiter, expected_output_tokens: int = 512):
+        """Initialize the wrapper around an existing LLM client"""
+        self.llm = llm
+        self.limiter = limiter
+        self.expected_output_tokens = expected_output_tokens
+
+    def invoke(self, prompt: str) -> Any:
+        """Invoke the wrapped LLM once the rate limiter allows it"""
+        tokens = estimate_tokens(prompt) + self.expected_output_tokens
+        attempt = 0
+        while True:
+            self.limiter.acquire(tokens)
+            try:
+                response = self.llm.invoke(prompt)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt >= self.limiter.max_retries:
+                    raise
+                attempt += 1
+                self.limiter.record_rate_limited(_retry_after(e))
+                continue
+            self.limiter.record_success()
+            return response
+
+def run_concurrently(func: Callable[[Any], Any], items: Iterable[Any], max_workers: int = 4) -> Iterator[Tuple[int, Any]]:
+    """Run func over items in a bounded thread pool, yielding (index, result) as each call completes"""
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,182 @@
+import json
+import os
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Path to a JSON file mapping canonical skill names to lists of aliases
+SKILLS_TAXONOMY_ENV = "SKILLS_TAXONOMY_PATH"
+
+# Canonical skill -> aliases as they appear in resumes (matched case-insensitively on word boundaries)
+DEFAULT_SKILLS_TAXONOMY: Dict[str, List[str]] = {
+    "python": ["python", "python3"],
+    "java": ["java", "core java", "j2ee"],
+    "javascript": ["javascript", "java script", "js", "es6"],
+    "typescript": ["typescript"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "c sharp"],
+    "golang": ["golang"],
+    "ruby": ["ruby", "ruby on rails", "rails"],
+    "php": ["php"],
+    "scala": ["scala"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "r language": ["r programming", "rstudio"],
+    "matlab": ["matlab"],
+    "sql": ["sql", "t-sql", "pl/sql", "plsql"],
+    "mysql": ["mysql"],
+    "postgresql": ["postgresql", "postgres"],
+    "oracle": ["oracle", "oracle db"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "nosql": ["nosql"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "react": ["react", "reactjs", "react.js"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vuejs", "vue.js"],
+    "node.js": ["node.js", "nodejs", "node js"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "spring boot": ["spring framework", "springboot"],
+    ".net": [".net", "dotnet", "asp.net"],
+    "rest api": ["rest api", "restful", "rest apis", "restful api"],
+    "graphql": ["graphql"],
+    "microservices": ["microservices", "microservice"],
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure", "microsoft azure"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "jenkins": ["jenkins"],
+    "ci/cd": ["ci/cd", "continuous integration", "continuous delivery"],
+    "git": ["git", "github", "gitlab", "bitbucket"],
+    "linux": ["linux", "unix", "ubuntu"],
+    "bash": ["bash", "shell scripting"],
+    "machine learning": ["machine learning", "ml"],
+    "deep learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"],
+    "computer vision": ["computer vision"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "spark": ["spark", "pyspark", "apache spark"],
+    "hadoop": ["hadoop"],
+    "kafka": ["kafka"],
+    "airflow": ["airflow"],
+    "data analysis": ["data analysis", "data analytics"],
+    "data visualization": ["data visualization", "data visualisation"],
+    "statistics": ["statistics", "statistical analysis"],
+    "tableau": ["tableau"],
+    "power bi": ["power bi", "powerbi"],
+    "excel": ["excel", "ms excel", "microsoft excel"],
+    "etl": ["etl"],
+    "selenium": ["selenium"],
+    "testing": ["unit testing", "test automation", "qa testing"],
+    "agile": ["agile", "scrum", "kanban"],
+    "jira": ["jira"],
+    "project management": ["project management", "pmp"],
+    "product management": ["product management"],
+    "leadership": ["leadership", "team lead", "team leadership"],
+    "communication": ["communication", "communication skills"],
+    "problem solving": ["problem solving", "problem-solving"],
+    "cybersecurity": ["cybersecurity", "cyber security", "information security"],
+    "networking": ["networking", "tcp/ip"],
+    "salesforce": ["salesforce"],
+    "sap": ["sap"],
+    "figma": ["figma"],
+    "ui/ux": ["ui/ux", "ux design", "ui design", "user experience"],
+    "seo": ["seo", "search engine optimization"],
+    "digital marketing": ["digital marketing"],
+    "accounting": ["accounting", "bookkeeping"],
+    "financial analysis": ["financial analysis", "financial modeling", "financial modelling"],
+}
+
+def load_skills_taxonomy(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Load a skills taxonomy from a JSON file, falling back to the built-in taxonomy"""
+    path = path or os.getenv(SKILLS_TAXONOMY_ENV)
+    if not path:
+        return DEFAULT_SKILLS_TAXONOMY
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that finds many keywords in a single pass over a text"""
+
+    def __init__(self, keywords: Dict[str, str]):
+        """Build the automaton from a mapping of lowercase keyword -> value"""
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, str]]] = [[]]
+
+        for keyword, value in keywords.items():
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append((len(keyword), value))
+
+        # Breadth-first pass to set failure links and inherit their outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, value) for every keyword occurring on word boundaries in a lowercase text"""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+
+            for length, value in self._output[state]:
+                start = i - length + 1
+                # Only accept whole words, so "java" does not match inside "javascript"
+                if start > 0 and text[start - 1].isalnum() and text[start].isalnum():
+                    continue
+                if i + 1 < len(text) and text[i + 1].isalnum() and char.isalnum():
+                    continue
+                yield start, i + 1, value
+
+class SkillMatcher:
+    """Match resume text against a skills taxonomy and return canonical skill names"""
+
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None):
+        """Initialize the matcher from a canonical skill -> aliases taxonomy"""
+        self.taxonomy = taxonomy or load_skills_taxonomy()
+        keywords = {}
+        for canonical, aliases in self.taxonomy.items():
+            for alias in [canonical] + list(aliases):
+                keywords[alias.lower()] = canonical
+        self.automaton = KeywordAutomaton(keywords)
+
+    def canonicalize(self, skill: str) -> str:
+        """Map a skill name to its canonical form, or its normalised self if unknown"""
+        normalized = " ".join(skill.lower().split())
+        for start, end, canonical in self.automaton.find(normalized):
+            if start == 0 and end == len(normalized):
+                return canonical
+        return normalized
+
+    def find_skills(self, text: str) -> List[str]:
+        """Find canonical skills mentioned in a text, in order of first mention"""
+        skills = []
+        seen = set()
+        for _, _, canonical in self.automaton.find(text.lower()):
+            if canonical not in seen:
+                seen.add(canonical)
+                skills.append(canonical)
+        return skills